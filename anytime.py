@@ -0,0 +1,164 @@
+import heapq
+import time
+from visited import CellSet
+from path import Path, CODES
+
+INF = float("inf")
+
+
+class AnytimeSolution():
+    """
+    One solution reported by the anytime search.
+    bound is the proven suboptimality factor: cost <= bound * optimal cost.
+    """
+    def __init__(self, path, cost, weight, bound, num_explored, elapsed):
+        self.path = path
+        self.cost = cost
+        self.weight = weight
+        self.bound = bound
+        self.num_explored = num_explored
+        self.elapsed = elapsed
+
+    @property
+    def actions(self):
+        return self.path.actions
+
+    @property
+    def cells(self):
+        return self.path.cells
+
+    def __repr__(self):
+        return (f"AnytimeSolution(cost={self.cost}, weight={self.weight}, "
+                f"bound={self.bound:.3f}, elapsed={self.elapsed:.6f})")
+
+
+class AnytimePlanner():
+    """
+    Anytime Repairing A* (ARA*).
+
+    Starts with an inflated heuristic weight to get a quick path, then lowers
+    the weight step by step. Between iterations only the states whose cost
+    improved (OPEN plus the INCONS list) are re-queued, so earlier search
+    effort is reused instead of restarting A* from scratch.
+    """
+    def __init__(self, maze, method="manhattan", weight=3.0, weight_step=0.5, time_budget=None):
+        if weight < 1:
+            raise Exception("heuristic weight must be at least 1")
+        self.maze = maze
+        self.method = method
+        self.heuristic = maze.heuristic_function(method)
+        self.weight = weight
+        self.weight_step = weight_step
+        self.deadline = None if time_budget is None else time.perf_counter() + time_budget
+
+        self.g = {maze.start: 0}
+        self.parents = {maze.start: None}   # state -> (parent state, action)
+        self.h = {}
+        self.open = []                      # Heap of (f, state), may contain stale entries
+        self.open_keys = {}                 # Key of the live OPEN entry for each state
+        self.closed = CellSet(maze.width, maze.height)
+        self.incons = set()
+        self.num_explored = 0
+        self.explored = CellSet(maze.width, maze.height)
+
+    def _h(self, state):
+        h = self.h.get(state)
+        if h is None:
+            h = self.h[state] = self.heuristic(state)
+        return h
+
+    def _push(self, state):
+        key = self.g[state] + self.weight * self._h(state)
+        self.open_keys[state] = key
+        heapq.heappush(self.open, (key, state))
+
+    def _min_open_key(self):
+        while self.open:
+            key, state = self.open[0]
+            if self.open_keys.get(state) == key:
+                return key
+            heapq.heappop(self.open)
+        return INF
+
+    def _expired(self):
+        return self.deadline is not None and time.perf_counter() >= self.deadline
+
+    def _improve_path(self):
+        """Runs weighted A* until the goal cannot be improved at the current weight."""
+        goal = self.maze.goal
+        while True:
+            goal_key = self.g.get(goal, INF) + self.weight * self._h(goal)
+            if self._min_open_key() >= goal_key:
+                return True
+
+            # Checking the clock is cheap next to an expansion but not free
+            if self.num_explored % 64 == 0 and self._expired():
+                return False
+
+            _, state = heapq.heappop(self.open)
+            del self.open_keys[state]
+            self.closed.add(state)
+            self.num_explored += 1
+            self.explored.add(state)
+
+            for action, succ in self.maze.neighbors(state):
+                score_g = self.g[state] + self.maze.cost(succ)
+                if score_g < self.g.get(succ, INF):
+                    self.g[succ] = score_g
+                    self.parents[succ] = (state, action)
+                    if succ in self.closed:
+                        # Already expanded at this weight: revisit next iteration
+                        self.incons.add(succ)
+                    else:
+                        self._push(succ)
+
+    def _bound(self):
+        # min over OPEN and INCONS of g + h gives a lower bound on the optimal cost
+        lower = min(
+            (self.g[s] + self._h(s) for s in list(self.open_keys) + list(self.incons)),
+            default=INF
+        )
+        cost = self.g[self.maze.goal]
+        if lower >= cost:
+            return 1.0
+        return min(self.weight, cost / lower)
+
+    def _solution(self, bound, started):
+        codes = bytearray()
+        state = self.maze.goal
+        while self.parents[state] is not None:
+            parent, action = self.parents[state]
+            codes.append(CODES[action])
+            state = parent
+        path = Path.from_reversed(self.maze.goal, len(codes), codes)
+        return AnytimeSolution(path, self.g[self.maze.goal], self.weight, bound,
+                               self.num_explored, time.perf_counter() - started)
+
+    def solutions(self):
+        """
+        Generator yielding an AnytimeSolution each time the search finishes an
+        iteration, until the path is proven optimal or the time budget is spent.
+        """
+        started = time.perf_counter()
+        self._push(self.maze.start)
+
+        while True:
+            finished = self._improve_path()
+            if not finished:
+                return
+            if self.g.get(self.maze.goal, INF) == INF:
+                raise Exception("no solution")
+
+            bound = self._bound()
+            yield self._solution(bound, started)
+            if bound <= 1 or self.weight <= 1 or self._expired():
+                return
+
+            # Lower the weight and re-queue only the states whose cost changed
+            self.weight = max(1.0, self.weight - self.weight_step)
+            states = set(self.open_keys) | self.incons
+            self.open_keys = {s: self.g[s] + self.weight * self._h(s) for s in states}
+            self.open = [(key, s) for s, key in self.open_keys.items()]
+            heapq.heapify(self.open)
+            self.incons = set()
+            self.closed.clear()
@@ -0,0 +1,46 @@
+import os
+import sys
+import time
+import random
+import argparse
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from maze import Maze
+
+
+def timed(maze, algo, prune):
+    start_time = time.perf_counter()
+    maze.solve(algo, prune=prune)
+    return time.perf_counter() - start_time, maze.num_explored, maze.co_path
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Searches with and without dead-end filling on generated mazes.")
+    parser.add_argument("--sizes", default="51,101,201,401")
+    parser.add_argument("--algos", default="dfs,greedy,bfs,a*")
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+
+    random.seed(args.seed)
+    algos = args.algos.split(",")
+    print(f"{'Maze':<10} {'Fill (s)':>9} {'Sealed':>7} {'Algo':<8} {'Nodes':>8} {'Pruned':>8} {'Time (s)':>9} {'Pruned (s)':>11}")
+    for size in (int(size) for size in args.sizes.split(",")):
+        maze = Maze(width=size, height=size)
+        start_time = time.perf_counter()
+        mask = maze.dead_end_filling()
+        fill_time = time.perf_counter() - start_time
+        open_cells = sum(not wall for row in maze.walls for wall in row)
+
+        for algo in algos:
+            plain_time, plain_nodes, plain_cost = timed(maze, algo, False)
+            pruned_time, pruned_nodes, pruned_cost = timed(maze, algo, True)
+            if algo in ["bfs", "a*"] and pruned_cost != plain_cost:
+                raise Exception(f"{size}x{size} {algo}: pruned cost {pruned_cost} differs from {plain_cost}")
+            print(
+                f"{f'{size}x{size}':<10} {fill_time:>9.4f} {mask.num_sealed / open_cells:>7.0%} {algo:<8} "
+                f"{plain_nodes:>8} {pruned_nodes:>8} {plain_time:>9.4f} {pruned_time:>11.4f}"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,74 @@
+import os
+import sys
+import time
+import random
+import argparse
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from maze import Maze
+import parallel_bfs
+
+
+def layer_widths(maze):
+    # Sizes of the BFS layers parallel_bfs expands, recorded on a serial run
+    widths = []
+    expand = parallel_bfs._expand
+
+    def recording(args):
+        widths.append(len(args[0]))
+        return expand(args)
+
+    parallel_bfs._expand = recording
+    try:
+        maze.solve_parallel_bfs(workers=1)
+    finally:
+        parallel_bfs._expand = expand
+    return widths
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Parallel BFS from 1 to N worker processes, with the BFS layer widths that decide whether workers are used at all.")
+    parser.add_argument("--size", type=int, default=501, help="width and height of the generated maze (odd)")
+    parser.add_argument("--max-workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--repeats", type=int, default=3, help="runs per worker count, the best one is kept")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--min-parallel", type=int, default=4096, help="smallest layer handed to the workers")
+    parser.add_argument("--open", action="store_true", help="use an open grid with no walls instead of a generated maze")
+    parser.add_argument("--check", action="store_true", help="also run the serial 'bfs' and compare co_path (slow on big mazes)")
+    args = parser.parse_args()
+
+    random.seed(args.seed)
+    if args.open:
+        rows = [" " * args.size for _ in range(args.size)]
+        rows[0] = "A" + rows[0][1:]
+        rows[-1] = rows[-1][:-1] + "B"
+        m = Maze(text="\n".join(rows))
+    else:
+        print(f"Generating {args.size}x{args.size} maze...")
+        m = Maze(width=args.size, height=args.size)
+
+    widths = layer_widths(m)
+    wide = sum(width >= args.min_parallel for width in widths)
+    print(f"{len(widths)} layers, widest {max(widths)} cells, {wide} of them handed to workers (min_parallel={args.min_parallel})")
+
+    if args.check:
+        m.solve("bfs")
+        print("Serial bfs co_path:", m.co_path)
+
+    print(f"{'Workers':>8} {'Time (s)':>12} {'Speedup':>8} {'Path Cost':>10}")
+    baseline = None
+    for workers in range(1, args.max_workers + 1):
+        best = None
+        for _ in range(args.repeats):
+            start_time = time.perf_counter()
+            m.reset_state()
+            parallel_bfs.parallel_bfs(m, workers, min_parallel=args.min_parallel)
+            elapsed = time.perf_counter() - start_time
+            best = elapsed if best is None else min(best, elapsed)
+        if baseline is None:
+            baseline = best
+        print(f"{workers:>8} {best:>12.4f} {baseline / best:>8.2f} {m.co_path:>10}")
+
+
+if __name__ == "__main__":
+    main()
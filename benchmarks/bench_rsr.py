@@ -0,0 +1,75 @@
+import os
+import sys
+import time
+import random
+import argparse
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from maze import Maze
+
+
+def open_rooms(maze, rooms):
+    # Clear random rectangles out of a generated maze to get open-room layouts
+    for _ in range(rooms):
+        height = random.randint(3, max(3, maze.height // 4))
+        width = random.randint(3, max(3, maze.width // 4))
+        top = random.randrange(0, maze.height - height + 1)
+        left = random.randrange(0, maze.width - width + 1)
+        for row in range(top, top + height):
+            for col in range(left, left + width):
+                maze.set_wall(row, col, False)
+
+
+def corpus(sizes, per_size, rooms):
+    # Generated mazes as they come, and the same mazes with rooms cleared out
+    for size in sizes:
+        for index in range(per_size):
+            yield f"{size}x{size} #{index}", Maze(width=size, height=size)
+            maze = Maze(width=size, height=size)
+            open_rooms(maze, rooms)
+            yield f"{size}x{size} #{index} rooms", maze
+
+
+def timed(maze, algo):
+    start_time = time.perf_counter()
+    maze.solve(algo)
+    return time.perf_counter() - start_time, maze.num_explored, maze.co_path
+
+
+def main():
+    parser = argparse.ArgumentParser(description="A* against A* with rectangular symmetry reduction on generated mazes.")
+    parser.add_argument("--sizes", default="51,101,201")
+    parser.add_argument("--per-size", type=int, default=3, help="generated mazes per size")
+    parser.add_argument("--rooms", type=int, default=8, help="rectangles cleared in the open-room variants")
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+
+    random.seed(args.seed)
+    sizes = [int(size) for size in args.sizes.split(",")]
+    print(f"{'Maze':<20} {'A* (s)':>9} {'A* nodes':>9} {'Prep (s)':>9} {'RSR (s)':>9} {'RSR nodes':>10} {'Kept':>6} {'Cost':>6}")
+    totals = [0.0, 0, 0.0, 0.0, 0]
+    for name, maze in corpus(sizes, args.per_size, args.rooms):
+        astar_time, astar_nodes, astar_cost = timed(maze, "a*")
+
+        start_time = time.perf_counter()
+        reduction = maze.rectangle_decomposition()
+        prep_time = time.perf_counter() - start_time
+        rsr_time, rsr_nodes, rsr_cost = timed(maze, "rsr")
+        if rsr_cost != astar_cost:
+            raise Exception(f"{name}: rsr cost {rsr_cost} differs from a* cost {astar_cost}")
+
+        open_cells = sum(not wall for row in maze.walls for wall in row)
+        print(
+            f"{name:<20} {astar_time:>9.4f} {astar_nodes:>9} {prep_time:>9.4f} {rsr_time:>9.4f} "
+            f"{rsr_nodes:>10} {reduction.num_nodes / open_cells:>6.0%} {rsr_cost:>6}"
+        )
+        for i, value in enumerate((astar_time, astar_nodes, prep_time, rsr_time, rsr_nodes)):
+            totals[i] += value
+
+    print(
+        f"{'Total':<20} {totals[0]:>9.4f} {totals[1]:>9} {totals[2]:>9.4f} {totals[3]:>9.4f} {totals[4]:>10}"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,48 @@
+import os
+import sys
+import json
+import argparse
+import statistics
+import subprocess
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Runs in a fresh interpreter so every measurement pays a cold import
+PROBE = """
+import sys, time, json
+t0 = time.perf_counter()
+import maze
+t1 = time.perf_counter()
+m = maze.Maze(sys.argv[1])
+m.solve(sys.argv[2])
+t2 = time.perf_counter()
+heavy = [name for name in ("PIL", "imageio", "tkinter", "numpy") if name in sys.modules]
+print(json.dumps({"import": t1 - t0, "first_solve": t2 - t1, "heavy": heavy}))
+"""
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Measures 'import maze' and time-to-first-solve in fresh processes.")
+    parser.add_argument("maze", nargs="?", default=os.path.join(ROOT, "maze_examples", "maze21.txt"))
+    parser.add_argument("--algo", default="a*")
+    parser.add_argument("--runs", type=int, default=10)
+    args = parser.parse_args()
+
+    imports, solves, heavy = [], [], set()
+    for _ in range(args.runs):
+        output = subprocess.run(
+            [sys.executable, "-c", PROBE, args.maze, args.algo],
+            cwd=ROOT, capture_output=True, text=True, check=True
+        ).stdout
+        result = json.loads(output)
+        imports.append(result["import"])
+        solves.append(result["first_solve"])
+        heavy.update(result["heavy"])
+
+    print(f"import maze:         median {statistics.median(imports) * 1000:8.2f} ms")
+    print(f"time to first solve: median {statistics.median(solves) * 1000:8.2f} ms")
+    print("heavy modules loaded:", ", ".join(sorted(heavy)) if heavy else "none")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,89 @@
+import os
+import sys
+import json
+import time
+import random
+import argparse
+import resource
+import subprocess
+import tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from maze import Maze
+import tiled
+
+
+def run_child(args):
+    # Solve once in a fresh process so peak RSS belongs to this configuration only
+    if args.rss_limit:
+        # RLIMIT_DATA covers the heap and private mappings but not the
+        # file-backed tile maps, so it is a hard ceiling on everything else
+        limit = resource.getrlimit(resource.RLIMIT_DATA)[1]
+        resource.setrlimit(resource.RLIMIT_DATA, (tiled.parse_size(args.rss_limit), limit))
+    maze = tiled.TiledMaze(args.tiled_path, cache_tiles=args.cache_tiles, frontier_limit=args.frontier_limit)
+    start_time = time.perf_counter()
+    maze.solve(args.algo)
+    elapsed = time.perf_counter() - start_time
+    print(json.dumps({
+        "time": elapsed,
+        "num_explored": maze.num_explored,
+        "co_path": maze.co_path,
+        "tile_misses": maze.tile_misses,
+        "spilled": maze.spilled,
+        "max_rss_kb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss,
+    }))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Out-of-core solving throughput as tile size and tile cache size vary.")
+    parser.add_argument("--size", type=int, default=1001, help="width and height of the generated maze (odd)")
+    parser.add_argument("--algo", choices=["bfs", "a*"], default="bfs")
+    parser.add_argument("--tile-sizes", default="16,32,64,128")
+    parser.add_argument("--cache-sizes", default="4,16,64,256", help="resident tiles")
+    parser.add_argument("--frontier-limit", type=int, default=4096, help="frontier entries kept in memory in total, across all f-value buckets")
+    parser.add_argument("--rss-limit", default=None, help="hard RLIMIT_DATA for each run, e.g. 64M")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--child", action="store_true", help=argparse.SUPPRESS)
+    parser.add_argument("--tiled-path", help=argparse.SUPPRESS)
+    parser.add_argument("--cache-tiles", type=int, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        run_child(args)
+        return
+
+    random.seed(args.seed)
+    print(f"Generating {args.size}x{args.size} maze...")
+    workdir = tempfile.mkdtemp()
+    text_path = os.path.join(workdir, "maze.txt")
+    Maze(width=args.size, height=args.size).save_to_file(text_path)
+
+    print(f"{'Tile':>6} {'Cache':>6} {'Time (s)':>10} {'States/s':>10} {'Misses':>8} {'Spilled':>8} {'Max RSS (MiB)':>14}")
+    for tile_size in [int(size) for size in args.tile_sizes.split(",")]:
+        tiled_path = os.path.join(workdir, f"maze_{tile_size}.tiled")
+        tiled.convert(text_path, tiled_path, tile_size)
+        for cache_tiles in [int(size) for size in args.cache_sizes.split(",")]:
+            command = [
+                sys.executable, os.path.abspath(__file__), "--child",
+                "--tiled-path", tiled_path, "--cache-tiles", str(cache_tiles),
+                "--frontier-limit", str(args.frontier_limit), "--algo", args.algo,
+            ]
+            if args.rss_limit:
+                command += ["--rss-limit", args.rss_limit]
+            result = subprocess.run(command, capture_output=True, text=True)
+            if result.returncode != 0:
+                print(f"{tile_size:>6} {cache_tiles:>6}  failed: {result.stderr.strip().splitlines()[-1]}")
+                continue
+            stats = json.loads(result.stdout)
+            print(
+                f"{tile_size:>6} {cache_tiles:>6} {stats['time']:>10.4f} "
+                f"{stats['num_explored'] / stats['time']:>10.0f} {stats['tile_misses']:>8} "
+                f"{stats['spilled']:>8} {stats['max_rss_kb'] / 1024:>14.1f}"
+            )
+        os.remove(tiled_path)
+    os.remove(text_path)
+    os.rmdir(workdir)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,70 @@
+import time
+
+# Reasons a search can stop before it finds a solution
+MAX_EXPANSIONS = "max_expansions"
+TIME_BUDGET = "time_budget"
+CANCELLED = "cancelled"
+
+
+class SearchBudget():
+    """
+    Limits for one Maze.solve call: a maximum number of expansions, a
+    time budget in seconds, and a cancellation token (any object with an
+    is_set() method, such as threading.Event).
+
+    The search loop only compares num_explored with next_check on each
+    expansion; the clock and the token are looked at before the first
+    expansion and then every check_every expansions, and the expansion
+    limit is checked exactly.
+    """
+    def __init__(self, max_expansions=None, time_budget=None, cancel=None, check_every=256):
+        self.max_expansions = max_expansions
+        self.cancel = cancel
+        self.check_every = check_every
+        self.start_time = time.perf_counter()
+        self.deadline = None if time_budget is None else self.start_time + time_budget
+        self.next_check = 0  # Check once before anything is expanded
+
+    def _schedule(self, num_explored):
+        next_check = num_explored + self.check_every
+        if self.max_expansions is not None:
+            next_check = min(next_check, self.max_expansions)
+        self.next_check = next_check
+
+    def check(self, num_explored):
+        """Returns the reason the search must stop, or None to keep going."""
+        if self.max_expansions is not None and num_explored >= self.max_expansions:
+            return MAX_EXPANSIONS
+        if self.cancel is not None and self.cancel.is_set():
+            return CANCELLED
+        if self.deadline is not None and time.perf_counter() >= self.deadline:
+            return TIME_BUDGET
+        self._schedule(num_explored)
+        return None
+
+    def exhausted(self, reason, num_explored, frontier_size):
+        return BudgetExhausted(reason, num_explored, frontier_size, time.perf_counter() - self.start_time)
+
+
+class BudgetExhausted():
+    """
+    Returned by Maze.solve when a limit stopped the search before it found
+    a solution. maze.num_explored and maze.explored keep the partial
+    search; maze.solution stays None.
+    """
+    status = "budget exhausted"
+
+    def __init__(self, reason, num_explored, frontier_size, elapsed):
+        self.reason = reason
+        self.num_explored = num_explored
+        self.frontier_size = frontier_size
+        self.elapsed = elapsed
+
+    def __str__(self):
+        return (
+            f"{self.status} ({self.reason}) after {self.num_explored} expansions "
+            f"in {self.elapsed:.6f}s, {self.frontier_size} nodes left in the frontier"
+        )
+
+    def __repr__(self):
+        return f"BudgetExhausted({self.reason!r}, num_explored={self.num_explored})"
@@ -0,0 +1,210 @@
+import json
+import os
+import struct
+from array import array
+from node import Node
+from frontiers import QueueFrontier, StackFrontier, HeapFrontier, BucketQueueFrontier
+from path import ACTIONS, CODES
+
+MAGIC = b"MAZECKP1"
+_HEADER = struct.Struct("<8sQ")   # magic, length of the JSON description that follows
+
+
+def _numbers(values):
+    # Scores stay ints unless a heuristic produced floats (euclidean)
+    values = list(values)
+    if any(isinstance(value, float) for value in values):
+        return array("d", values)
+    return array("q", values)
+
+
+def write(filename, meta, arrays):
+    """
+    Writes a JSON description followed by the raw arrays, to a temporary
+    file first so an interrupted write never replaces a good checkpoint.
+    """
+    description = json.dumps({
+        "meta": meta,
+        "arrays": [[name, values.typecode, len(values)] for name, values in arrays.items()],
+    }).encode()
+    temporary = filename + ".tmp"
+    with open(temporary, "wb") as f:
+        f.write(_HEADER.pack(MAGIC, len(description)))
+        f.write(description)
+        for values in arrays.values():
+            values.tofile(f)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(temporary, filename)
+
+
+def read(filename):
+    """Returns (meta, arrays) as written by write()."""
+    with open(filename, "rb") as f:
+        magic, length = _HEADER.unpack(f.read(_HEADER.size))
+        if magic != MAGIC:
+            raise Exception(f"{filename} is not a search checkpoint file")
+        description = json.loads(f.read(length))
+        arrays = {}
+        for name, typecode, count in description["arrays"]:
+            values = array(typecode)
+            values.fromfile(f, count)
+            arrays[name] = values
+    return description["meta"], arrays
+
+
+class SearchCheckpoint():
+    """
+    Periodic on-disk snapshot of a Maze.solve frontier search, so a crashed
+    or preempted search can pick up where it stopped.
+
+    A snapshot holds the counters, the explored cells as a sparse list of
+    cell ids, the cheapest known costs, the frontier in its internal order
+    and the frontier nodes with their chains of parents, flattened into
+    arrays (parents before children). Everything stored is proportional to
+    the search state, never to the maze, so the explored ids are logged
+    while the search runs instead of being scanned out of the bitset.
+
+    Resuming rebuilds exactly the state that was saved, including heap
+    entries and tie-breaking counters, so the resumed search expands the
+    same nodes in the same order as an uninterrupted one. The maze itself
+    is not stored; resume against the same maze.
+    """
+    def __init__(self, filename, maze, algo, method, tie_break, every=100_000, prune=False):
+        self.filename = filename
+        self.maze = maze
+        self.every = every
+        self.next_save = every
+        self.explored_ids = array("q")
+        self.meta = {
+            "algo": algo,
+            "method": method if algo in ["a*", "greedy"] else None,
+            "tie_break": tie_break if algo in ["a*", "greedy"] else None,
+            "prune": prune,
+            "width": maze.width,
+            "height": maze.height,
+            "starts": [list(start) for start in maze.starts],
+            "goals": [list(goal) for goal in maze.goals],
+        }
+
+    def exists(self):
+        return os.path.exists(self.filename)
+
+    def record(self, cell):
+        row, col = cell
+        self.explored_ids.append(row * self.maze.width + col)
+
+    def save(self, frontier, best_g, trace=None):
+        """Writes the current search state and schedules the next snapshot."""
+        queued, order = _frontier_nodes(frontier)
+
+        # Flatten the frontier nodes and their ancestors, each node once
+        index = {}
+        nodes = []
+        for node in queued:
+            chain = []
+            while node is not None and id(node) not in index:
+                chain.append(node)
+                node = node.parent
+            for node in reversed(chain):
+                index[id(node)] = len(nodes)
+                nodes.append(node)
+
+        width = self.maze.width
+        arrays = {
+            "explored": self.explored_ids,
+            "node_state": array("q", (node.state[0] * width + node.state[1] for node in nodes)),
+            "node_parent": array("q", (-1 if node.parent is None else index[id(node.parent)] for node in nodes)),
+            "node_action": array("b", (-1 if node.action is None else CODES[node.action] for node in nodes)),
+            "node_g": _numbers(node.score_g for node in nodes),
+            "node_h": _numbers(node.score_h for node in nodes),
+            "frontier": array("q", (index[id(node)] for node in queued)),
+            "frontier_order": array("q", order),
+            "best_state": array("q", (row * width + col for row, col in best_g)),
+            "best_g": _numbers(best_g.values()),
+        }
+        if trace is not None:
+            arrays["trace"] = trace.expanded
+
+        meta = dict(self.meta, num_explored=self.maze.num_explored)
+        if isinstance(frontier, HeapFrontier):
+            meta["counter"] = frontier.counter
+        elif isinstance(frontier, BucketQueueFrontier):
+            meta["current"] = frontier.current
+        write(self.filename, meta, arrays)
+        self.next_save = self.maze.num_explored + self.every
+
+    def restore(self, frontier, best_g, trace=None):
+        """
+        Loads the snapshot into an empty frontier and best_g dict, and sets
+        the maze's num_explored and explored set.
+        """
+        meta, arrays = read(self.filename)
+        for key, value in self.meta.items():
+            if meta.get(key) != value:
+                raise Exception(f"{self.filename} was written by a different search ({key}: {meta.get(key)!r})")
+        if trace is not None and "trace" not in arrays:
+            raise Exception(f"{self.filename} has no search trace, resume without save_gif")
+
+        width = self.maze.width
+        nodes = []
+        for state, parent, action, score_g, score_h in zip(
+            arrays["node_state"], arrays["node_parent"], arrays["node_action"], arrays["node_g"], arrays["node_h"]
+        ):
+            nodes.append(Node(
+                state=divmod(state, width),
+                parent=None if parent < 0 else nodes[parent],
+                action=None if action < 0 else ACTIONS[action],
+                score_g=score_g,
+                score_h=score_h,
+            ))
+        _fill_frontier(frontier, [nodes[i] for i in arrays["frontier"]], arrays["frontier_order"], meta)
+
+        for state, score_g in zip(arrays["best_state"], arrays["best_g"]):
+            best_g[divmod(state, width)] = score_g
+        self.explored_ids = arrays["explored"]
+        explored = self.maze.explored
+        for state in self.explored_ids:
+            explored.add_id(state)
+        if trace is not None:
+            trace.expanded = arrays["trace"]
+        self.maze.num_explored = meta["num_explored"]
+        self.next_save = self.maze.num_explored + self.every
+
+    def remove(self):
+        """Deletes the checkpoint once the search it belongs to has finished."""
+        if self.exists():
+            os.remove(self.filename)
+
+
+def _frontier_nodes(frontier):
+    # The queued nodes in the frontier's internal order, plus what else that
+    # order depends on: heap insertion counters or bucket lengths
+    if isinstance(frontier, HeapFrontier):
+        return [entry[-1] for entry in frontier.heap], [abs(entry[-2]) for entry in frontier.heap]
+    if isinstance(frontier, BucketQueueFrontier):
+        return [node for bucket in frontier.buckets for node in bucket], [len(bucket) for bucket in frontier.buckets]
+    if isinstance(frontier, (QueueFrontier, StackFrontier)):
+        return list(frontier.frontier), []
+    raise Exception(f"cannot checkpoint a {type(frontier).__name__}")
+
+
+def _fill_frontier(frontier, nodes, order, meta):
+    if isinstance(frontier, HeapFrontier):
+        # The saved list already satisfies the heap invariant
+        frontier.heap = [frontier.entry(node, counter) for node, counter in zip(nodes, order)]
+        frontier.counter = meta["counter"]
+    elif isinstance(frontier, BucketQueueFrontier):
+        if len(order) != len(frontier.buckets):
+            raise Exception("checkpoint was written for a different maximum step cost")
+        first = 0
+        for bucket, length in zip(frontier.buckets, order):
+            bucket.extend(nodes[first:first + length])
+            first += length
+        frontier.current = meta["current"]
+        frontier.size = len(nodes)
+    else:
+        frontier.frontier = nodes
+        return
+    for node in nodes:
+        frontier.states[node.state] = frontier.states.get(node.state, 0) + 1
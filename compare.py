@@ -2,6 +2,7 @@ import os
 import csv
 import time
 from maze import Maze  # Import Maze class directly
+from heuristics import names as heuristic_names
 
 def main():
     maze_files = [
@@ -23,8 +24,9 @@ def main():
         "dfs": [None], # No heuristics required
         "uniform": [None], # No heuristics required
         "bidirectional": [None], # No heuristics required
-        "a*": ["manhattan", "euclidean", "chebyshev"], # Heuristics for A*
-        "greedy": ["manhattan", "euclidean", "chebyshev"], # Heuristics for Greedy
+        "a*": heuristic_names(), # Every registered heuristic for A*
+        "greedy": heuristic_names(), # Every registered heuristic for Greedy
+        "rsr": ["manhattan"], # A* on the rectangle-reduced graph
     }
 
     results = []
@@ -34,6 +36,10 @@ def main():
 
     num_runs_per_test = 1 # Number of runs for each test to get a more accurate average
 
+    # Caps for a single run, so pathological searches (e.g. DFS on big mazes) cannot stall the comparison
+    max_expansions = 1_000_000
+    time_budget = 60.0 # Seconds
+
     for maze_file_path in maze_files:
         if not os.path.exists(maze_file_path):
             print(f"Warning: Maze file '{maze_file_path}' not found. Skipping.")
@@ -56,25 +62,35 @@ def main():
                 total_time = 0
                 total_states_explored = 0
                 total_path_cost = 0
+                exhausted = False
                 successful_runs = 0
 
                 for run_count in range(num_runs_per_test):
                     try:
                         # Create and load the Maze object
                         m = Maze(maze_file_path)
+                        m.connectivity() # Built once per maze, outside the timed solve
 
                         # Start timing the solving process
                         start_time = time.perf_counter()
                         
                         # Call the solve method directly
-                        if algorithm in ["a*", "greedy"]:
+                        if algorithm in ["a*", "greedy", "rsr"]:
                             # Pass heuristic if required
-                            m.solve(algorithm, method=heuristic, save_gif=False) # Always 'False' for GIF in quantitative comparisons
+                            result = m.solve(algorithm, method=heuristic, save_gif=False, # Always 'False' for GIF in quantitative comparisons
+                                             max_expansions=max_expansions, time_budget=time_budget)
                         else:
-                            m.solve(algorithm, save_gif=False) # Always 'False' for GIF in quantitative comparisons
+                            result = m.solve(algorithm, save_gif=False, # Always 'False' for GIF in quantitative comparisons
+                                             max_expansions=max_expansions, time_budget=time_budget)
                         
                         end_time = time.perf_counter()
 
+                        if result is not None:
+                            # A cap stopped the search before it found a solution
+                            print(f"  --> {test_case_name} stopped in run {run_count+1}: {result}")
+                            exhausted = True
+                            continue
+
                         # Collect metrics directly from the Maze object
                         time_taken = end_time - start_time
                         states_explored = m.num_explored
@@ -107,6 +123,9 @@ def main():
                         int(avg_path_cost)
                     ]
                     results.append(row)
+                elif exhausted:
+                    row = [os.path.basename(maze_file_path), algorithm, heuristic if heuristic else "N/A", "Budget Exhausted", "Budget Exhausted", "Budget Exhausted"]
+                    results.append(row)
                 else:
                     # If all runs failed or no solution was found
                     row = [os.path.basename(maze_file_path), algorithm, heuristic if heuristic else "N/A", "Error", "Error", "Error"]
@@ -0,0 +1,93 @@
+from array import array
+
+
+class ComponentIndex():
+    """
+    Connected components of a maze's open cells, built once with a
+    union-find labeling pass over the grid. Afterwards any reachability
+    question is a pair of near-constant-time find() calls, so an unreachable
+    goal is detected before a search even starts.
+
+    Removing a wall is handled incrementally with open_cell(). Adding a wall
+    can split a component, which union-find cannot undo, so the maze drops
+    its index in that case and rebuilds it on the next query.
+    """
+    def __init__(self, maze):
+        self.width = maze.width
+        self.height = maze.height
+        cells = self.width * self.height
+        self.parent = array("i", [-1]) * cells   # -1 marks walls
+        self.size = array("i", [0]) * cells      # Component size, valid at roots
+
+        width = self.width
+        walls = maze.walls
+        for row in range(self.height):
+            walls_row = walls[row]
+            above = walls[row - 1] if row > 0 else None
+            base = row * width
+            for col in range(width):
+                if walls_row[col]:
+                    continue
+                index = base + col
+                self.parent[index] = index
+                self.size[index] = 1
+                if col > 0 and not walls_row[col - 1]:
+                    self._union(index, index - 1)
+                if above is not None and not above[col]:
+                    self._union(index, index - width)
+
+        # Point every cell straight at its root so later finds are one step
+        for index in range(cells):
+            if self.parent[index] >= 0:
+                self.parent[index] = self._find(index)
+
+    def _find(self, index):
+        parent = self.parent
+        while parent[index] != index:
+            parent[index] = parent[parent[index]] # Path halving
+            index = parent[index]
+        return index
+
+    def _union(self, a, b):
+        a = self._find(a)
+        b = self._find(b)
+        if a == b:
+            return
+        if self.size[a] < self.size[b]:
+            a, b = b, a
+        self.parent[b] = a
+        self.size[a] += self.size[b]
+
+    def component(self, cell):
+        """Returns the id of the component containing cell, or None for a wall."""
+        row, col = cell
+        index = row * self.width + col
+        if self.parent[index] < 0:
+            return None
+        return self._find(index)
+
+    def component_size(self, cell):
+        root = self.component(cell)
+        return 0 if root is None else self.size[root]
+
+    def connected(self, a, b):
+        """True if open cells a and b are joined by some path."""
+        root = self.component(a)
+        return root is not None and root == self.component(b)
+
+    def any_connected(self, sources, targets):
+        """True if some cell in sources can reach some cell in targets."""
+        roots = {self.component(cell) for cell in sources}
+        roots.discard(None)
+        return any(self.component(cell) in roots for cell in targets)
+
+    def open_cell(self, row, col, walls):
+        """Updates the index after the wall at (row, col) was removed."""
+        index = row * self.width + col
+        if self.parent[index] >= 0:
+            return
+        self.parent[index] = index
+        self.size[index] = 1
+        for r, c in ((row - 1, col), (row + 1, col), (row, col - 1), (row, col + 1)):
+            if 0 <= r < self.height and 0 <= c < self.width and not walls[r][c]:
+                self._union(index, r * self.width + c)
@@ -0,0 +1,138 @@
+"""
+Dead-end filling.
+
+A dead end is an open cell with at most one open neighbor. Unless it is a
+start or a goal, no simple path between a start and a goal can pass
+through it, so it can be sealed like a wall; that may turn its neighbor
+into a new dead end, and so on until only the corridors that can lie on
+some start -> goal path (and loops hanging off them) are left. In the
+perfect mazes generate_maze carves, that is little more than the solution
+itself.
+
+With NumPy the open-neighbor counts come from one shifted-sum convolution
+over the whole grid, and every step seals a whole layer of dead ends at
+once; after the first step the counts are only recomputed next to the
+layer just sealed, so each step costs the size of the layer, not of the
+maze. Without NumPy the same cells are sealed by a queue in pure Python.
+
+Sealing only removes cells no shortest path needs, so searches on the
+filled maze find paths of the same cost, whatever the terrain costs.
+"""
+
+
+class DeadEndMask():
+    """
+    The maze's walls with every dead end sealed, for the starts and goals
+    it was built with. Maze.dead_end_filling() builds it once per maze and
+    Maze.solve(..., prune=True) searches through it.
+    """
+    def __init__(self, maze):
+        self.width = maze.width
+        self.height = maze.height
+        self.endpoints = (tuple(maze.starts), tuple(maze.goals))
+        keep = [row * self.width + col for row, col in maze.starts + maze.goals]
+        try:
+            import numpy as np
+        except ImportError:
+            self.walls = _fill_python(maze.walls, self.width, self.height, keep)
+        else:
+            self.walls = _fill_numpy(np, maze.walls, self.width, self.height, keep)
+        self.num_sealed = sum(
+            blocked and not wall
+            for blocked_row, wall_row in zip(self.walls, maze.walls)
+            for blocked, wall in zip(blocked_row, wall_row)
+        )
+
+    def is_sealed(self, cell):
+        row, col = cell
+        return self.walls[row][col]
+
+    def neighbors(self, state):
+        # Maze.neighbors on the filled walls
+        row, col = state
+        candidates = [
+            ("up", (row - 1, col)),
+            ("down", (row + 1, col)),
+            ("left", (row, col - 1)),
+            ("right", (row, col + 1))
+        ]
+
+        result = []
+        for action, (r, c) in candidates:
+            if 0 <= r < self.height and 0 <= c < self.width and not self.walls[r][c]:
+                result.append((action, (r, c)))
+        return result
+
+
+def _fill_numpy(np, walls, width, height, keep):
+    # Pad with a ring of walls so every open cell has four in-bounds neighbors
+    padded = np.zeros((height + 2, width + 2), dtype=bool)
+    padded[1:-1, 1:-1] = ~np.array(walls, dtype=bool)
+    stride = width + 2
+    is_open = padded.ravel()
+    kept = np.zeros(is_open.size, dtype=bool)
+    kept[[(index // width + 1) * stride + index % width + 1 for index in keep]] = True
+
+    # First layer: open-neighbor counts of the whole grid
+    counts = np.zeros((height + 2, width + 2), dtype=np.int8)
+    counts[1:-1, 1:-1] = (
+        padded[:-2, 1:-1].astype(np.int8) + padded[2:, 1:-1] + padded[1:-1, :-2] + padded[1:-1, 2:]
+    )
+    layer = np.flatnonzero(is_open & (counts.ravel() <= 1) & ~kept)
+
+    # Later layers can only appear next to the cells just sealed
+    offsets = np.array([-stride, stride, -1, 1])
+    while layer.size:
+        is_open[layer] = False
+        candidates = np.unique((layer[:, None] + offsets).ravel())
+        candidates = candidates[is_open[candidates] & ~kept[candidates]]
+        counts = (
+            is_open[candidates - stride].astype(np.int8) + is_open[candidates + stride]
+            + is_open[candidates - 1] + is_open[candidates + 1]
+        )
+        layer = candidates[counts <= 1]
+
+    return (~padded[1:-1, 1:-1]).tolist()
+
+
+def _fill_python(walls, width, height, keep):
+    is_open = bytearray(width * height)
+    for row in range(height):
+        for col in range(width):
+            if not walls[row][col]:
+                is_open[row * width + col] = 1
+    kept = set(keep)
+
+    def neighbors(index):
+        row, col = divmod(index, width)
+        if row > 0:
+            yield index - width
+        if row + 1 < height:
+            yield index + width
+        if col > 0:
+            yield index - 1
+        if col + 1 < width:
+            yield index + 1
+
+    counts = bytearray(width * height)
+    layer = []
+    for index in range(width * height):
+        if is_open[index]:
+            counts[index] = sum(is_open[other] for other in neighbors(index))
+            if counts[index] <= 1 and index not in kept:
+                layer.append(index)
+
+    while layer:
+        for index in layer:
+            is_open[index] = 0
+        next_layer = []
+        for index in layer:
+            for other in neighbors(index):
+                if is_open[other]:
+                    counts[other] -= 1
+                    # Only on reaching 1, so a cell losing two neighbors at once is queued once
+                    if counts[other] == 1 and other not in kept:
+                        next_layer.append(other)
+        layer = next_layer
+
+    return [[not is_open[row * width + col] for col in range(width)] for row in range(height)]
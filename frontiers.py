@@ -1,4 +1,9 @@
 from node import Node
+from collections import deque
+import heapq
+
+# Tie-breaking policies of HeapFrontier
+TIE_BREAKS = ("fifo", "lifo", "high-g", "cross")
 
 class StackFrontier():
     """
@@ -19,6 +24,9 @@ class StackFrontier():
         # Return True if the frontier is empty
         return len(self.frontier) == 0
 
+    def __len__(self):
+        return len(self.frontier)
+
     def remove(self):
         # Remove and return the last node (LIFO)
         if self.empty():
@@ -44,31 +52,121 @@ class QueueFrontier(StackFrontier):
             return node
 
 
-class PriorityQueueFrontierforUniformCost(QueueFrontier):
+class BucketQueueFrontier():
     """
-    Frontier for Uniform Cost Search.
-    Nodes are sorted by path cost (score_g).
+    Frontier for Uniform Cost Search with small integer step costs (Dial's algorithm).
+    Nodes are kept in a circular array of FIFO buckets indexed by score_g.
+    Every queued score_g lies within max_cost of the smallest one, so
+    max_cost + 1 buckets are enough and add/remove are O(1).
     """
+    def __init__(self, max_cost=1):
+        self.buckets = [deque() for _ in range(max_cost + 1)]
+        self.current = 0      # Lowest score_g that may still be queued
+        self.size = 0
+        self.states = {}      # Number of queued nodes per state
+
     def add(self, node):
-        self.frontier.append(node)
-        self.frontier.sort(key=lambda n: n.score_g)  # Sort by score_g
+        # Append the node to the bucket of its path cost
+        self.buckets[node.score_g % len(self.buckets)].append(node)
+        self.states[node.state] = self.states.get(node.state, 0) + 1
+        self.size += 1
 
+    def contains_state(self, state):
+        # Check if a given state is already in the frontier
+        return state in self.states
 
-class PriorityQueueFrontierforGreedy(QueueFrontier):
-    """
-    Frontier for Greedy Best-First Search.
-    Nodes are sorted by heuristic value (score_h).
-    """
-    def add(self, node):
-        self.frontier.append(node)
-        self.frontier.sort(key=lambda n: n.score_h)  # Sort by heuristic
+    def empty(self):
+        # Return True if the frontier is empty
+        return self.size == 0
 
+    def __len__(self):
+        return self.size
 
-class PriorityQueueFrontierforAStar(QueueFrontier):
+    def remove(self):
+        # Remove and return the oldest node with the lowest score_g
+        if self.empty():
+            raise Exception("empty frontier")
+        bucket = self.buckets[self.current % len(self.buckets)]
+        while not bucket:
+            self.current += 1
+            bucket = self.buckets[self.current % len(self.buckets)]
+        node = bucket.popleft()
+        self.size -= 1
+        if self.states[node.state] == 1:
+            del self.states[node.state]
+        else:
+            self.states[node.state] -= 1
+        return node
+
+
+class HeapFrontier():
     """
-    Frontier for A* Search.
-    Nodes are sorted by f(n) = g(n) + h(n).
+    Binary-heap frontier for A* and Greedy Best-First Search. Nodes come
+    out by key(node) (score_f or score_h), and nodes with equal keys are
+    ordered by the tie-breaking policy:
+
+    "fifo"   - oldest first, the order a stable sort by key gives
+    "lifo"   - newest first
+    "high-g" - largest score_g first (deepest node), then newest
+    "cross"  - smallest cross product between the start->goal and
+               node->goal vectors first, preferring nodes on the straight
+               line to the goal
+
+    Ties are broken without changing the keys, so A* stays optimal.
     """
+    def __init__(self, key, tie_break="fifo", start=None, goal=None):
+        if tie_break not in TIE_BREAKS:
+            raise Exception(f"unknown tie-breaking policy: {tie_break} (choose from {', '.join(TIE_BREAKS)})")
+        self.key = key
+        self.tie_break = tie_break
+        self.start = start
+        self.goal = goal
+        self.heap = []
+        self.counter = 0      # Insertion order
+        self.states = {}      # Number of queued nodes per state
+
+    def _cross(self, state):
+        goal_row, goal_col = self.goal
+        d_row1, d_col1 = state[0] - goal_row, state[1] - goal_col
+        d_row2, d_col2 = self.start[0] - goal_row, self.start[1] - goal_col
+        return abs(d_row1 * d_col2 - d_row2 * d_col1)
+
+    def entry(self, node, counter):
+        """Heap entry for a node pushed as the counter-th one: key, tie-breakers, node."""
+        key = self.key(node)
+        if self.tie_break == "fifo":
+            return (key, counter, node)
+        elif self.tie_break == "lifo":
+            return (key, -counter, node)
+        elif self.tie_break == "high-g":
+            return (key, -node.score_g, -counter, node)
+        else:
+            return (key, self._cross(node.state), counter, node)
+
     def add(self, node):
-        self.frontier.append(node)
-        self.frontier.sort(key=lambda n: n.score_f)  # Sort by f(n) = g(n) + h(n)
\ No newline at end of file
+        # Push the node with its key and tie-breakers in front of it
+        self.counter += 1
+        heapq.heappush(self.heap, self.entry(node, self.counter))
+        self.states[node.state] = self.states.get(node.state, 0) + 1
+
+    def contains_state(self, state):
+        # Check if a given state is already in the frontier
+        return state in self.states
+
+    def empty(self):
+        # Return True if the frontier is empty
+        return len(self.heap) == 0
+
+    def __len__(self):
+        return len(self.heap)
+
+    def remove(self):
+        # Remove and return the node with the lowest key
+        if self.empty():
+            raise Exception("empty frontier")
+        node = heapq.heappop(self.heap)[-1]
+        if self.states[node.state] == 1:
+            del self.states[node.state]
+        else:
+            self.states[node.state] -= 1
+        return node
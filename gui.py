@@ -2,6 +2,8 @@
 import tkinter as tk
 from tkinter import filedialog, messagebox, ttk
 from maze import Maze
+from render import terrain_color
+import heuristics
 from PIL import Image, ImageTk
 import time
 import threading
@@ -14,6 +16,7 @@ class MazeSolverGUI:
         self.setup_ui()
         self.cell_size = 30  # Size of each cell in pixels
         self.maze = None # Initialize maze to None
+        self.cancel_event = threading.Event() # Set by the Stop button to cancel a running solve
         
     def setup_ui(self):
         # Create the control frame for buttons and input fields
@@ -38,13 +41,13 @@ class MazeSolverGUI:
         
         # Algorithm selection dropdown
         self.algo_var = tk.StringVar(value="bfs")
-        tk.OptionMenu(control_frame, self.algo_var, "a*", "bfs", "dfs", "greedy", "uniform", "bidirectional").pack(side=tk.LEFT, padx=5)
+        tk.OptionMenu(control_frame, self.algo_var, "a*", "bfs", "dfs", "greedy", "uniform", "bidirectional", "portfolio").pack(side=tk.LEFT, padx=5)
 
         # Heuristic selection (enabled only for A* and Greedy)
         tk.Label(control_frame, text="Heuristic:").pack(side=tk.LEFT, padx=2)
         self.heuristic_var = tk.StringVar(value="manhattan")
         self.heuristic_combobox = ttk.Combobox(control_frame, textvariable=self.heuristic_var, 
-                                            values=["manhattan", "euclidean", "chebyshev"], state="disabled", width=10)
+                                            values=heuristics.names(), state="disabled", width=10)
         self.heuristic_combobox.pack(side=tk.LEFT, padx=2)
         self.algo_var.trace("w", self.on_algo_selected)  # Update heuristic options when algorithm changes
         self.on_algo_selected() # Set initial heuristic state
@@ -52,8 +55,10 @@ class MazeSolverGUI:
         # Buttons for solving and saving
         tk.Button(control_frame, text="Solve", command=self.solve_maze).pack(side=tk.LEFT, padx=5)
         tk.Button(control_frame, text="Solve with GIF", command=lambda: self.solve_maze(solve_gif=True)).pack(side=tk.LEFT, padx=5)
+        tk.Button(control_frame, text="Stop", command=self.stop_solving).pack(side=tk.LEFT, padx=5)
         tk.Button(control_frame, text="Save Solution", command=self.save_solution).pack(side=tk.LEFT, padx=5)
         tk.Button(control_frame, text="Save Solution GIF", command=self.save_solution_gif).pack(side=tk.LEFT, padx=5)
+        tk.Button(control_frame, text="Replay", command=self.replay_trace).pack(side=tk.LEFT, padx=5)
         tk.Button(control_frame, text="Save maze to file", command=self.save_maze).pack(side=tk.LEFT, padx=5)
 
         # Zoom controls
@@ -132,10 +137,13 @@ class MazeSolverGUI:
                 
                 if col:  # Wall
                     self.canvas.create_rectangle(x1, y1, x2, y2, fill="#282828", outline="") # Dark gray wall
-                elif (i, j) == self.maze.start:
+                elif (i, j) in self.maze.starts:
                     self.canvas.create_rectangle(x1, y1, x2, y2, fill="#FF0000", outline="") # Red start
-                elif (i, j) == self.maze.goal:
+                elif (i, j) in self.maze.goals:
                     self.canvas.create_rectangle(x1, y1, x2, y2, fill="#00AB1C", outline="") # Green goal
+                elif self.maze.costs is not None and self.maze.costs[i][j] > 1:
+                    fill = "#%02X%02X%02X" % terrain_color(self.maze.costs[i][j])
+                    self.canvas.create_rectangle(x1, y1, x2, y2, fill=fill, outline="") # Brown weighted terrain
                 else:
                     self.canvas.create_rectangle(x1, y1, x2, y2, fill="#EDF0FC", outline="") # Off-white empty cell
     
@@ -147,6 +155,8 @@ class MazeSolverGUI:
             
         # Clear the canvas by redrawing the maze in its initial state
         self.draw_maze()
+        self.cancel_event = threading.Event()
+        cancel = self.cancel_event
 
         def solve_thread():
             algo = self.algo_var.get()
@@ -154,17 +164,15 @@ class MazeSolverGUI:
             start_time = time.time()
             
             try:
-                if solve_gif:
-                    if heuristic:
-                        self.maze.solve(algo, save_gif=True, method=heuristic)
-                    else:
-                        self.maze.solve(algo, save_gif=True)
+                if heuristic:
+                    result = self.maze.solve(algo, save_gif=solve_gif, method=heuristic, cancel=cancel)
                 else:
-                    if heuristic:
-                        self.maze.solve(algo, method=heuristic)
-                    else:
-                        self.maze.solve(algo)
+                    result = self.maze.solve(algo, save_gif=solve_gif, cancel=cancel)
                 end_time = time.time()
+                if result is not None:
+                    # Stopped before a solution was found
+                    messagebox.showinfo("Info", f"Stopped: {result}")
+                    return
                 self.draw_solution()
                 messagebox.showinfo("Info", f"Solved in {end_time-start_time:.2f} seconds\n"
                                         f"Path length: {self.maze.co_path}\n"
@@ -175,6 +183,10 @@ class MazeSolverGUI:
         # Run the solving process in a separate thread to keep the GUI responsive
         threading.Thread(target=solve_thread, daemon=True).start()
     
+    def stop_solving(self):
+        # Ask the running solve to stop; it checks the event every few hundred expansions
+        self.cancel_event.set()
+
     def draw_solution(self):
         """Draws the solution path and explored nodes on the maze."""
         if hasattr(self, 'maze') and self.maze.solution:
@@ -184,7 +196,7 @@ class MazeSolverGUI:
                     x1, y1 = j * self.cell_size, i * self.cell_size
                     x2, y2 = x1 + self.cell_size, y1 + self.cell_size
                     # Check if it's not the start or goal before drawing as explored
-                    if (i, j) != self.maze.start and (i, j) != self.maze.goal:
+                    if (i, j) not in self.maze.starts and (i, j) not in self.maze.goals:
                         self.canvas.create_rectangle(x1, y1, x2, y2, fill="#D46155", outline="") # Reddish/Orange explored
 
             # Then draw the solution path on top (if it exists)
@@ -192,9 +204,36 @@ class MazeSolverGUI:
                 x1, y1 = j * self.cell_size, i * self.cell_size
                 x2, y2 = x1 + self.cell_size, y1 + self.cell_size
                 # Ensure start and goal are not overwritten by blue solution path
-                if (i, j) != self.maze.start and (i, j) != self.maze.goal:
+                if (i, j) not in self.maze.starts and (i, j) not in self.maze.goals:
                     self.canvas.create_rectangle(x1, y1, x2, y2, fill="#DCF071", outline="") # Yellow solution
     
+    def replay_trace(self):
+        """Animates the search recorded by the last "Solve with GIF" without solving again."""
+        if self.maze is None or self.maze.trace is None:
+            messagebox.showwarning("Warning", "Please solve the maze with GIF first!")
+            return
+
+        self.draw_maze()
+        trace = self.maze.trace
+        cells = trace.cells()
+        markers = set(self.maze.starts) | set(self.maze.goals)
+        per_tick = max(1, len(trace.expanded) // 200) # Replay in about 200 ticks
+
+        def step():
+            for _ in range(per_tick):
+                cell = next(cells, None)
+                if cell is None:
+                    self.draw_solution()
+                    return
+                i, j = cell
+                if cell not in markers:
+                    x1, y1 = j * self.cell_size, i * self.cell_size
+                    x2, y2 = x1 + self.cell_size, y1 + self.cell_size
+                    self.canvas.create_rectangle(x1, y1, x2, y2, fill="#D46155", outline="") # Reddish/Orange explored
+            self.root.after(15, step)
+
+        step()
+
     def save_solution(self):
         # Save the current maze solution as a PNG image
         if hasattr(self, 'maze') and self.maze.solution:
@@ -0,0 +1,131 @@
+"""
+Registry of the heuristics A*, greedy and the planners can use.
+
+A heuristic is registered with the distance it estimates for a move of
+d_row rows and d_col columns (both non-negative). Before a search it is
+compiled against the maze's goals into a plain callable on (row, col)
+states; with several goals the distances to all of them are folded into a
+per-cell table once (with NumPy when it is installed), so every lookup is
+a single index instead of a loop over the goals.
+
+New heuristics only need a register() call to show up in the CLI, the GUI
+and compare.py:
+
+    @register("double-manhattan", admissible=False)
+    def double_manhattan(d_row, d_col):
+        return 2 * (d_row + d_col)
+"""
+from array import array
+
+HEURISTICS = {} # name -> Heuristic, in registration order
+
+
+class Heuristic():
+    """
+    A named distance estimate. distance(d_row, d_col) works on Python
+    numbers; array_distance(np, d_row, d_col), if given, does the same on
+    NumPy arrays and is used to build per-cell tables.
+    """
+    def __init__(self, name, distance, admissible=True, array_distance=None):
+        self.name = name
+        self.distance = distance
+        self.admissible = admissible
+        self.array_distance = array_distance
+
+    def table(self, width, height, goals):
+        """
+        Per-cell distance to the nearest goal as a height x width NumPy array,
+        or None when NumPy is not installed.
+        """
+        try:
+            import numpy as np
+        except ImportError:
+            return None
+        rows = np.arange(height).reshape(-1, 1)
+        cols = np.arange(width).reshape(1, -1)
+        if self.array_distance is not None:
+            distance = lambda d_row, d_col: self.array_distance(np, d_row, d_col)
+        else:
+            distance = np.vectorize(self.distance)
+        table = None
+        for goal_row, goal_col in goals:
+            values = np.broadcast_to(distance(np.abs(rows - goal_row), np.abs(cols - goal_col)), (height, width))
+            table = values.copy() if table is None else np.minimum(table, values)
+        return table
+
+    def compile(self, goals, width=None, height=None):
+        """
+        Returns a callable state -> distance to the nearest goal. A single
+        goal gets a closure; several goals get a precomputed table lookup
+        when the grid size is given and NumPy is available.
+        """
+        distance = self.distance
+        goals = list(goals)
+        if len(goals) == 1:
+            goal_row, goal_col = goals[0]
+
+            def h(state):
+                return distance(abs(state[0] - goal_row), abs(state[1] - goal_col))
+            return h
+
+        table = self.table(width, height, goals) if width is not None else None
+        if table is not None:
+            # A flat array indexed by cell id: indexing it gives plain Python
+            # numbers (NumPy scalars are slow), and it stores 8 bytes a cell
+            # where nested lists would hold a Python object per cell
+            if table.dtype.kind in "iu":
+                values = array("q", table.astype("int64").tobytes())
+            else:
+                values = array("d", table.astype("float64").tobytes())
+
+            def h(state):
+                return values[state[0] * width + state[1]]
+            return h
+
+        def h(state):
+            row, col = state
+            return min(distance(abs(row - goal_row), abs(col - goal_col)) for goal_row, goal_col in goals)
+        return h
+
+    def __repr__(self):
+        return f"Heuristic({self.name!r})"
+
+
+def register(name, admissible=True, array_distance=None):
+    """Decorator that registers a distance function under name."""
+    def decorator(distance):
+        HEURISTICS[name] = Heuristic(name, distance, admissible, array_distance)
+        return distance
+    return decorator
+
+
+def get(name):
+    """Returns the registered Heuristic, raising for unknown names."""
+    try:
+        return HEURISTICS[name]
+    except KeyError:
+        raise Exception(f"unknown heuristic: {name} (choose from {', '.join(HEURISTICS)})") from None
+
+
+def names():
+    return list(HEURISTICS)
+
+
+def admissible_names():
+    """Heuristics that never overestimate the remaining cost on a 4-connected grid."""
+    return [name for name, heuristic in HEURISTICS.items() if heuristic.admissible]
+
+
+@register("manhattan", array_distance=lambda np, d_row, d_col: d_row + d_col)
+def manhattan(d_row, d_col):
+    return d_row + d_col
+
+
+@register("euclidean", array_distance=lambda np, d_row, d_col: np.sqrt(d_row * d_row + d_col * d_col))
+def euclidean(d_row, d_col):
+    return (d_row ** 2 + d_col ** 2) ** 0.5
+
+
+@register("chebyshev", array_distance=lambda np, d_row, d_col: np.maximum(d_row, d_col))
+def chebyshev(d_row, d_col):
+    return max(d_row, d_col)
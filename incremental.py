@@ -0,0 +1,139 @@
+import heapq
+from path import Path, CODES, OPPOSITE
+
+INF = float("inf")
+
+
+class IncrementalPlanner():
+    """
+    Incremental replanner based on Lifelong Planning A* (LPA*).
+
+    The planner keeps its g/rhs values and priority queue between calls, so
+    after toggling a few walls with set_wall() the next solve() only repairs
+    the part of the search that the change actually affected instead of
+    starting over like Maze.solve does.
+    """
+    def __init__(self, maze, method="manhattan"):
+        self.maze = maze
+        self.method = method
+        self.h = maze.heuristic_function(method)
+        self.g = {}               # Current cost-to-come estimate for each state
+        self.rhs = {}             # One-step lookahead cost for each state
+        self.queue = []           # Heap of (key, state), may contain stale entries
+        self.keys = {}            # Key of the live queue entry for each state
+
+        self.rhs[maze.start] = 0
+        self._push(maze.start)
+
+    def calculate_key(self, state):
+        # LPA* priority: [min(g, rhs) + h; min(g, rhs)]
+        best = min(self.g.get(state, INF), self.rhs.get(state, INF))
+        return (best + self.h(state), best)
+
+    def _push(self, state):
+        key = self.calculate_key(state)
+        self.keys[state] = key
+        heapq.heappush(self.queue, (key, state))
+
+    def _top(self):
+        # Drop stale heap entries until the top is the live entry of its state
+        while self.queue:
+            key, state = self.queue[0]
+            if self.keys.get(state) == key:
+                return key, state
+            heapq.heappop(self.queue)
+        return (INF, INF), None
+
+    def update_vertex(self, state):
+        """Recomputes rhs for a state and (re)queues it if it became inconsistent."""
+        if state != self.maze.start:
+            row, col = state
+            if self.maze.walls[row][col]:
+                self.rhs[state] = INF
+            else:
+                step = self.maze.cost(state)
+                self.rhs[state] = min(
+                    (self.g.get(pred, INF) + step for _, pred in self.maze.neighbors(state)),
+                    default=INF
+                )
+
+        if self.g.get(state, INF) != self.rhs.get(state, INF):
+            self._push(state)
+        else:
+            self.keys.pop(state, None)
+
+    def set_wall(self, row, col, value):
+        """
+        Adds (value=True) or removes (value=False) a wall and marks the
+        affected states for repair on the next solve().
+        """
+        if value and (row, col) in (self.maze.start, self.maze.goal):
+            raise Exception("cannot place a wall on the start or goal point")
+        if self.maze.walls[row][col] == value:
+            return
+
+        self.maze.set_wall(row, col, value)
+
+        # Only the toggled cell and the edges touching it changed cost
+        self.update_vertex((row, col))
+        for _, state in self.maze.neighbors((row, col)):
+            self.update_vertex(state)
+
+    def compute_shortest_path(self):
+        """Expands inconsistent states until the goal is consistent and optimal."""
+        goal = self.maze.goal
+        while True:
+            key, state = self._top()
+            if state is None:
+                break
+            if key >= self.calculate_key(goal) and self.rhs.get(goal, INF) == self.g.get(goal, INF):
+                break
+
+            heapq.heappop(self.queue)
+            del self.keys[state]
+
+            new_key = self.calculate_key(state)
+            if key < new_key:
+                self._push(state)
+                continue
+
+            self.maze.num_explored += 1
+            self.maze.explored.add(state)
+
+            if self.g.get(state, INF) > self.rhs.get(state, INF):
+                # Overconsistent: settle the state and propagate the improvement
+                self.g[state] = self.rhs[state]
+            else:
+                # Underconsistent: invalidate and let the neighbors find a new parent
+                self.g[state] = INF
+                self.update_vertex(state)
+
+            for _, succ in self.maze.neighbors(state):
+                self.update_vertex(succ)
+
+    def solve(self):
+        """
+        Re-solves the maze, reusing the search effort from previous calls.
+        Fills maze.solution, maze.co_path, maze.num_explored and maze.explored
+        like Maze.solve; the statistics only count this call's repair work.
+        """
+        self.maze.reset_state()
+        self.compute_shortest_path()
+
+        goal = self.maze.goal
+        if self.g.get(goal, INF) == INF:
+            raise Exception("no solution")
+
+        # Walk back from the goal, always stepping to a predecessor on a shortest path
+        codes = bytearray()
+        state = goal
+        while state != self.maze.start:
+            action, pred = min(
+                self.maze.neighbors(state),
+                key=lambda item: self.g.get(item[1], INF)
+            )
+            codes.append(CODES[OPPOSITE[action]])
+            state = pred
+
+        self.maze.solution = Path.from_reversed(goal, len(codes), codes)
+        self.maze.co_path = self.g[goal]
@@ -1,6 +1,8 @@
 import sys
 import time
 from maze import Maze
+from path import Path
+import heuristics
 
 def read_algorithm_choice():
     """
@@ -8,8 +10,8 @@ def read_algorithm_choice():
     Returns the chosen algorithm as a string.
     """
     while True:
-        algo = input("Choose algorithm (BFS, DFS, A*, Greedy, Uniform, Bidirectional): ").lower()
-        if algo in ["bfs", "dfs", "a*", "greedy", "uniform", "bidirectional"]:
+        algo = input("Choose algorithm (BFS, DFS, A*, Greedy, Uniform, Bidirectional, Portfolio): ").lower()
+        if algo in ["bfs", "dfs", "a*", "greedy", "uniform", "bidirectional", "portfolio"]:
             return algo
         print("Invalid algorithm. Please choose again.")
 
@@ -19,8 +21,9 @@ def read_heuristic_choice():
     Returns the chosen heuristic as a string.
     """
     while True:
-        heuristic = input("Choose heuristic (Manhattan, Euclidean, Chebyshev): ").lower()
-        if heuristic in ["manhattan", "euclidean", "chebyshev"]:
+        names = heuristics.names()  # Every registered heuristic
+        heuristic = input(f"Choose heuristic ({', '.join(name.capitalize() for name in names)}): ").lower()
+        if heuristic in names:
             return heuristic
         print("Invalid heuristic. Please choose again.")
 
@@ -42,8 +45,16 @@ def read_save_gif_choice():
             print("Invalid input. Please enter 'yes' or 'no'.")
 
 def main():
+    # "--service SOCKET" sends the solves to a running solver_service.py
+    args = sys.argv[1:]
+    service = None
+    if len(args) >= 2 and args[0] == "--service":
+        from solver_client import SolverClient
+        service = SolverClient(args[1])
+        args = args[2:]
+
     # Ensure at least one maze file is provided as a command-line argument
-    if len(sys.argv) < 2:
+    if not args:
         width = int(input("Enter maze width: "))
         height = int(input("Enter maze height: "))
         
@@ -55,7 +66,7 @@ def main():
 
         print("Algorithm selected:", algo)
         print("Generated Maze:")
-        m.print()  # Print the generated maze
+        m.print(fit=sys.stdout.isatty())  # Print the generated maze (downsampled if it does not fit the terminal)
         print("Solving...")
         start_time = time.perf_counter()
         if algo in ["a*", "greedy"]:
@@ -68,8 +79,10 @@ def main():
         print(f"Time taken: {end_time - start_time:.8f} seconds")
         print("States Explored:", m.num_explored)
         print("Cost of Path:", m.co_path)
+        if algo == "portfolio":
+            print(m.portfolio_report)
         print("Solution:")
-        m.print()
+        m.print(fit=sys.stdout.isatty())
         m.output_image("maze_solution.png", show_explored=True)  # Save the solution as an image
         save_maze = input("Do you want to save the maze to a file? (yes/no): ").lower()
         if save_maze in ["yes", "y"]:
@@ -88,19 +101,30 @@ def main():
             heuristic = read_heuristic_choice()
 
         # Ask user if they want to save an animated GIF of the solving process
-        save_gif, gif_filename = read_save_gif_choice()
+        # (the solver service does not record GIF frames)
+        save_gif, gif_filename = read_save_gif_choice() if service is None else (False, "")
         print("Algorithm selected:", algo)
 
         # Iterate over all maze files provided as arguments
-        for i in range(1, len(sys.argv)):
-            m = Maze(sys.argv[i])  # Create Maze instance from file
+        for i, maze_file in enumerate(args, start=1):
+            m = Maze(maze_file)  # Create Maze instance from file
             print(f"Maze {i}:")
-            m.print()              # Print the maze before solving
+            m.print(fit=sys.stdout.isatty())  # Print the maze before solving
             print("Solving...")
 
             # Start timing the solving process
             start_time = time.perf_counter()
-            if algo in ["a*", "greedy"]:
+            if service is not None:
+                # Solved by the service; the local Maze is only used for display
+                response = service.solve(maze_file, algo=algo, method=heuristic if algo in ["a*", "greedy"] else None)
+                if response["status"] != "ok":
+                    print("Error:", response["error"])
+                    continue
+                m.connected = tuple(tuple(cell) for cell in response["connected"])
+                m.solution = Path.from_actions(m.connected[0], response["actions"])
+                m.num_explored = response["num_explored"]
+                m.co_path = response["co_path"]
+            elif algo in ["a*", "greedy"]:
                 # Pass heuristic if required
                 m.solve(algo, method=heuristic, save_gif=save_gif)
             else:
@@ -115,11 +139,19 @@ def main():
             print(f"Time taken: {end_time - start_time:.8f} seconds")
             print("States Explored:", m.num_explored)
             print("Cost of Path:", m.co_path)
+            if algo == "portfolio" and service is None:
+                print(m.portfolio_report)
+            if len(m.starts) > 1 or len(m.goals) > 1:
+                start, goal = m.connected
+                print(f"Connected: start {start} -> goal {goal}")
             print("Solution:")
-            m.print()
+            m.print(fit=sys.stdout.isatty())
             
             # Save a PNG image of the maze with the solution and explored nodes
             m.output_image(f"maze{i}.png", show_explored=True)
 
+        if service is not None:
+            service.close()
+
 if __name__ == "__main__":
     main()
\ No newline at end of file
@@ -1,36 +1,72 @@
-from PIL import Image, ImageDraw, ImageTk
-import imageio
 from node import Node
+from frontiers import StackFrontier, QueueFrontier, HeapFrontier, BucketQueueFrontier
+from visited import CellSet
+from path import Path, ACTIONS, CODES, DELTAS, OPPOSITE
+from connectivity import ComponentIndex
+from search_trace import SearchTrace
+from budget import SearchBudget
+from search_step import SearchStep, run as run_steps
+from collections import deque
+from operator import attrgetter
+import heuristics
 import random
+import heapq
+
+
+def node_codes(node):
+    """Direction codes of the moves along a Node's parent chain, last move first."""
+    while node.parent is not None:
+        yield CODES[node.action]
+        node = node.parent
+
 
 class Maze():
-    def __init__(self, filename=None, width=None, height=None):
+    def __init__(self, filename=None, width=None, height=None, text=None, seed=None, workers=None):
         # Initialize maze state and statistics
         self.solution = None      # To store the solution path
         self.co_path = 0          # To count the solution steps
-        self.frames = []          # For GIF frames
+        self.trace = None         # Search trace for GIFs and replay (see search_trace.py)
         self.num_explored = 0     # To count explored states
-        self.explored = set()     # To keep track of explored nodes
-
-        if filename:
-            # Load maze from file
-            with open(filename) as f:
-                contents = f.read()
+        self.explored = None      # To keep track of explored nodes (bitset, see reset_state)
+        self.connected = None     # (start, goal) pair joined by the solution
+        self.costs = None         # Per-cell terrain costs, None when every move costs 1
+        self.max_cost = 1         # Largest terrain cost in the maze
+        self.components = None    # Connected-components index, built on first use
+        self.compiled_heuristics = {}  # (method, goals) -> compiled heuristic
+        self.rectangles = None    # Rectangle decomposition for "rsr", built on first use
+        self.dead_ends = None     # Walls with dead ends sealed, built on first use
+
+        if filename or text is not None:
+            if text is None:
+                # Load maze from file
+                with open(filename) as f:
+                    contents = f.read()
+            else:
+                # Maze given directly as the contents of a maze file
+                contents = text
 
             contents = contents.splitlines()
             self.height = len(contents)
             self.width = max(len(line) for line in contents)
 
             self.walls = []
+            self.starts = []
+            self.goals = []
+            costs = []
             for i in range(self.height):
                 row = []
+                cost_row = [1] * self.width
                 for j in range(self.width):
                     try:
-                        if contents[i][j] == "A":
-                            self.start = (i, j)
+                        if contents[i][j] in "123456789":
+                            # Weighted terrain: the digit is the cost of entering the cell
+                            cost_row[j] = int(contents[i][j])
+                            row.append(False)
+                        elif contents[i][j] == "A":
+                            self.starts.append((i, j))
                             row.append(False)
                         elif contents[i][j] == "B":
-                            self.goal = (i, j)
+                            self.goals.append((i, j))
                             row.append(False)
                         elif contents[i][j] == " ":
                             row.append(False)
@@ -39,10 +75,19 @@ class Maze():
                     except IndexError:
                         row.append(False)
                 self.walls.append(row)
+                costs.append(cost_row)
+
+            self.max_cost = max(max(row) for row in costs)
+            if self.max_cost > 1:
+                self.costs = costs
 
             # Validate start and goal for file-loaded mazes
-            if not hasattr(self, 'start') or not hasattr(self, 'goal'):
-                raise Exception("maze must have exactly one start and one goal point")
+            if not self.starts or not self.goals:
+                raise Exception("maze must have at least one start and one goal point")
+
+            # The first start and goal (in reading order) act as the primary pair
+            self.start = self.starts[0]
+            self.goal = self.goals[0]
 
         elif width and height:
             # Generate a new maze with given dimensions
@@ -52,16 +97,21 @@ class Maze():
             self.walls = [[True for _ in range(width)] for _ in range(height)]
             self.start = None
             self.goal = None
-            self.generate_maze() # Call maze generation algorithm
+            if seed is None and workers is None:
+                self.generate_maze() # Call maze generation algorithm
+            else:
+                self.generate_maze_tiled(seed, workers) # Reproducible, carved in parallel tiles
 
         else:
-            raise Exception("Must provide either a filename or width and height to initialize Maze.")
+            raise Exception("Must provide either a filename, maze text or width and height to initialize Maze.")
 
         # Common validation for both loading and generation
         if not hasattr(self, 'start') or not hasattr(self, 'goal'):
             # This check is mainly for generated mazes if they fail to set start/goal
             raise Exception("Generated maze must have a start and a goal point.")
 
+        self.explored = CellSet(self.width, self.height)
+
     def generate_maze(self):
         """
         Generates a maze using a Recursive Backtracking (DFS) algorithm,
@@ -70,6 +120,9 @@ class Maze():
         """
         # Initialize all cells as walls (True)
         self.walls = [[True for _ in range(self.width)] for _ in range(self.height)]
+        self.components = None
+        self.rectangles = None
+        self.dead_ends = None
         
         # Keep track of visited cells during generation
         visited = [[False for _ in range(self.width)] for _ in range(self.height)]
@@ -146,18 +199,42 @@ class Maze():
         if not open_cells:
             raise Exception("Generated maze has no open paths.")
 
-        self.start = random.choice(open_cells)
-        
-        # Ensure goal is different from start
-        if len(open_cells) > 1:
-            self.goal = random.choice([cell for cell in open_cells if cell != self.start])
-        else: # Handle very small mazes where start might be the only open cell
-            self.goal = self.start
-            if self.height > 1 or self.width > 1: # Try to find a different goal if possible
-                # If only one cell, start and goal are the same
-                pass
-            else:
-                raise Exception("Maze too small to have distinct start and goal.")
+        # Pick the start among cells that have at least one reachable
+        # neighbor, then the goal from the start's own component, so the
+        # pair is always distinct and connected without retrying
+        index = self.connectivity()
+        candidates = [cell for cell in open_cells if index.component_size(cell) > 1]
+        if candidates:
+            self.start = random.choice(candidates)
+            self.goal = random.choice([
+                cell for cell in candidates
+                if cell != self.start and index.connected(cell, self.start)
+            ])
+        elif self.height > 1 or self.width > 1:
+            # Only isolated cells: start and goal have to share one
+            self.start = self.goal = random.choice(open_cells)
+        else:
+            raise Exception("Maze too small to have distinct start and goal.")
+
+        self.starts = [self.start]
+        self.goals = [self.goal]
+
+    def generate_maze_tiled(self, seed=None, workers=None, tile_nodes=32):
+        """
+        Generates a maze by carving tiles in parallel worker processes and
+        joining them into one perfect maze before adding loops (see
+        parallel_generate.py). The same seed always gives the same maze,
+        whatever the number of workers.
+        """
+        from parallel_generate import generate_walls
+        if seed is None:
+            seed = random.randrange(1 << 63)
+        self.walls, self.start, self.goal = generate_walls(self.width, self.height, seed, tile_nodes, workers=workers)
+        self.starts = [self.start]
+        self.goals = [self.goal]
+        self.components = None
+        self.rectangles = None
+        self.dead_ends = None
 
     def reset_state(self):
         """
@@ -166,39 +243,62 @@ class Maze():
         """
         self.solution = None
         self.co_path = 0
+        self.connected = None
         self.num_explored = 0
-        self.explored = set()
-        self.frames = [] # Clear frames for new GIF generation
-
-    def print(self):
-        # Print the maze with solution and explored nodes if available
-        solution = self.solution[1] if self.solution is not None else None
-
-        print()
+        self.explored = CellSet(self.width, self.height)
+        self.trace = None # Recorded again by the next solve with save_gif=True
 
-        for i, row in enumerate(self.walls):
-            for j, col in enumerate(row):
-                if col:
-                    print("█", end="")                # Wall
+    def connectivity(self):
+        """Returns the connected-components index of the open cells, building it once."""
+        if self.components is None:
+            self.components = ComponentIndex(self)
+        return self.components
 
-                elif (i, j) == self.start:
-                    print("A", end="")                # Start
-
-                elif (i, j) == self.goal:
-                    print("B", end="")                # Goal
-
-                elif solution is not None and (i, j) in solution:
-                    print("*", end="")                # Solution path
-
-                elif solution is not None and (i, j) in self.explored:
-                    print(".", end="")                # Explored node
+    def is_solvable(self):
+        """
+        True if some start can reach some goal, answered without searching.
+        Builds the connectivity index on first use, which iter_solve then
+        reuses to reject unsolvable mazes before searching.
+        """
+        return self.connectivity().any_connected(self.starts, self.goals)
 
-                else:
-                    print(" ", end="")                # Empty space
+    def set_wall(self, row, col, value):
+        """
+        Adds (value=True) or removes (value=False) a wall. Removing a wall
+        updates the connectivity index in place; adding one may split a
+        component, so the index is dropped and rebuilt when next needed.
+
+        This is the only supported way to change walls once the maze is
+        generated: writing to self.walls directly leaves the connectivity
+        index, rectangle decomposition and dead-end mask describing the
+        old walls.
+        """
+        if self.walls[row][col] == value:
+            return
+        self.walls[row][col] = value
+        self.rectangles = None
+        self.dead_ends = None
+        if self.components is not None:
+            if value:
+                self.components = None
+            else:
+                self.components.open_cell(row, col, self.walls)
 
-            print()
+    def print(self, viewport=None, fit=False):
+        """
+        Print the maze with solution and explored nodes if available.
+        viewport=(top, left, height, width) crops the output and fit=True
+        downsamples large mazes to the terminal size.
+        """
+        import terminal
+        terminal.print_maze(self, viewport=viewport, fit=fit)
 
-        print()
+    def cost(self, state):
+        """Returns the cost of moving into the given cell (1 unless it is weighted terrain)."""
+        if self.costs is None:
+            return 1
+        row, col = state
+        return self.costs[row][col]
 
     def neighbors(self, state):
         # Return list of valid neighboring cells from the current state
@@ -217,360 +317,563 @@ class Maze():
         return result
 
     def heuristic(self, state, method):
-        """Computes the heuristic distance from the given state to the goal."""
-        row, col = state
-        goal_row, goal_col = self.goal
-        if method == "manhattan":
-            return abs(row - goal_row) + abs(col - goal_col)
-        elif method == "euclidean":
-            return ((row - goal_row) ** 2 + (col - goal_col) ** 2) ** 0.5
-        elif method == "chebyshev":
-            return max(abs(row - goal_row), abs(col - goal_col))
+        """Computes the heuristic distance from the given state to the nearest goal."""
+        return self.heuristic_function(method)(state)
 
-    def solve(self, algo, save_gif=False, method = "manhattan"):
+    def heuristic_function(self, method):
+        """
+        Returns the registered heuristic method compiled for this maze's goals,
+        a callable state -> distance. Raises for unknown heuristic names.
+        """
+        key = (method, tuple(self.goals))
+        h = self.compiled_heuristics.get(key)
+        if h is None:
+            h = heuristics.get(method).compile(self.goals, self.width, self.height)
+            self.compiled_heuristics[key] = h
+        return h
+
+    def solve(self, algo, save_gif=False, method = "manhattan", tie_break="fifo",
+              max_expansions=None, time_budget=None, cancel=None,
+              checkpoint=None, checkpoint_every=100_000, prune=False):
         """
         Finds a solution to the maze using the specified algorithm.
         Optionally saves the solution process as a GIF.
+
+        method names a registered heuristic (see heuristics.py) and
+        tie_break orders A* and Greedy nodes with equal keys ("fifo",
+        "lifo", "high-g" or "cross", see frontiers.HeapFrontier).
+
+        All start points are seeded into the frontier at once and the search
+        stops at the first goal reached, so mazes with several 'A' and 'B'
+        cells are solved in a single pass. self.connected records which
+        (start, goal) pair the solution joins.
+
+        max_expansions, time_budget (seconds) and cancel (e.g. a
+        threading.Event) bound the search. When one of them stops it, solve
+        returns a budget.BudgetExhausted with the partial statistics
+        instead of raising; otherwise it returns None. The clock starts
+        after the dead-end mask (prune) or rectangle decomposition (rsr)
+        is built, and the limits are checked before the first expansion.
+
+        checkpoint names a file the BFS, DFS, Uniform Cost, A* and Greedy
+        searches snapshot their state to every checkpoint_every expansions
+        and when a budget stops them (see checkpoint.SearchCheckpoint). If
+        the file exists, the search resumes from it and ends with the same
+        result and num_explored as an uninterrupted run. The file is
+        removed once the search finishes.
+
+        With prune=True the search runs on dead_end_filling(): it never
+        steps into a dead end, so it only touches cells that can lie on a
+        path from a start to a goal. Costs stay optimal for the algorithms
+        that are optimal anyway.
+
+        solve runs iter_solve to the end.
+        """
+        return run_steps(self.iter_solve(
+            algo, save_gif, method, tie_break, max_expansions, time_budget, cancel,
+            checkpoint, checkpoint_every, prune
+        ))
+
+    def iter_solve(self, algo, save_gif=False, method="manhattan", tie_break="fifo",
+                   max_expansions=None, time_budget=None, cancel=None,
+                   checkpoint=None, checkpoint_every=100_000, prune=False):
+        """
+        Generator version of solve, with the same arguments. It yields a
+        search_step.SearchStep after every expansion, then one FOUND step
+        with the solution or one STOPPED step when a budget ran out, and
+        returns what solve returns. Nothing runs until the first step is
+        pulled; pulling pauses and resumes the search, and close() (or
+        dropping the generator) abandons it with the partial state left on
+        the maze.
+
+        The same SearchStep is updated in place and yielded every time.
+        The portfolio and parallel BFS searches run in other processes and
+        only yield the final step; they check the budget per worker and per
+        BFS layer respectively.
         """
         # Reset maze state before starting a new solve operation
         self.reset_state()
 
-        # Initialize frontier with the starting position
-        start = Node(state=self.start, parent=None, action=None, score_h=self.heuristic(self.start, method))
+        if checkpoint is not None and algo not in ["bfs", "dfs", "a*", "greedy", "uniform"]:
+            raise Exception(f"checkpoints are not supported for {algo}")
+        if prune and algo not in ["bfs", "dfs", "a*", "greedy", "uniform", "bidirectional"]:
+            raise Exception(f"dead-end pruning is not supported for {algo}")
+
+        # The dead-end mask and the rectangle decomposition are built once
+        # per maze and kept, so they are built before the budget's clock
+        # starts; a budget only limits the search itself
+        if prune:
+            self.dead_end_filling()
+        if algo == "rsr":
+            self.rectangle_decomposition()
+
+        budget = None
+        if max_expansions is not None or time_budget is not None or cancel is not None:
+            budget = SearchBudget(max_expansions, time_budget, cancel)
+
+        # An unreachable goal is known from the connectivity index, there
+        # is no need to exhaust the frontier to find out. The index is only
+        # consulted once something built it, building it costs more than
+        # most searches; call is_solvable() to ask up front.
+        if self.components is not None and not self.components.any_connected(self.starts, self.goals):
+            raise Exception("no solution")
+
+        step = SearchStep(self)
         if algo == "bidirectional": # Special case for bidirectional search
-            self.solve_bidirectional(save_gif=save_gif)
+            return (yield from self._iter_bidirectional(save_gif, budget, step, prune))
+
+        if algo in ["portfolio", "parallel-bfs"]:
+            if algo == "portfolio": # Race several algorithms in parallel processes
+                result = self.solve_portfolio(budget=budget).result
+            else: # Level-synchronous BFS across worker processes
+                result = self.solve_parallel_bfs(budget=budget)
+            if result is not None:
+                yield step.stopped(result)
+                return result
+            yield step.found(self.connected[1], self.solution)
             return
 
+        if algo == "rsr": # A* on the rectangle-reduced graph
+            from rsr import iter_rsr
+            return (yield from iter_rsr(self, method, budget, step))
+
         if algo == "bfs":
-            from frontiers import QueueFrontier 
             frontier = QueueFrontier() 
 
         elif algo == "dfs":
-            from frontiers import StackFrontier 
             frontier = StackFrontier() 
 
         elif algo == "a*":
-            from frontiers import PriorityQueueFrontierforAStar 
-            frontier = PriorityQueueFrontierforAStar() 
+            frontier = HeapFrontier(attrgetter("score_f"), tie_break, self.start, self.goal)
 
         elif algo == "greedy":
-            from frontiers import PriorityQueueFrontierforGreedy 
-            frontier = PriorityQueueFrontierforGreedy() 
+            frontier = HeapFrontier(attrgetter("score_h"), tie_break, self.start, self.goal)
 
         elif algo == "uniform":
-            from frontiers import PriorityQueueFrontierforUniformCost 
-            frontier = PriorityQueueFrontierforUniformCost() 
+            frontier = BucketQueueFrontier(max_cost=self.max_cost)
         
-        # Add the start node to the frontier
-        frontier.add(start)
+        step.frontiers = (frontier,)
+        h = self.heuristic_function(method) if algo in ["a*", "greedy"] else None
+
+        # With save_gif only the order of expansions is recorded here, the
+        # frames are rendered from the trace when the GIF is saved
+        trace = SearchTrace(self.width, self.height) if save_gif else None
+        self.trace = trace
+
+        snapshot = None
+        if checkpoint is not None:
+            from checkpoint import SearchCheckpoint
+            snapshot = SearchCheckpoint(checkpoint, self, algo, method, tie_break, checkpoint_every, prune)
+
+        best_g = {}  # Cheapest known path cost per state (Uniform Cost and A*)
+        if snapshot is not None and snapshot.exists():
+            # Pick up the frontier, explored set and counters where the last run stopped
+            snapshot.restore(frontier, best_g, trace)
+        else:
+            # Add every start node to the frontier
+            for state in self.starts:
+                frontier.add(Node(state=state, parent=None, action=None, score_h=h(state) if h else 0))
+                best_g[state] = 0
+        goals = set(self.goals)
         
         # self.explored = set() # This line is moved to reset_state()
 
-        if save_gif:
-            self.frames.append(self._get_current_image(show_explored=True))
+        neighbors = self.dead_end_filling().neighbors if prune else self.neighbors
+
         # Main loop to search for the solution
 
         while True:
             # If nothing left in frontier, then no path exists
             if frontier.empty():
+                if snapshot is not None:
+                    snapshot.remove()
                 raise Exception("no solution")
 
+            if snapshot is not None and self.num_explored >= snapshot.next_save:
+                snapshot.save(frontier, best_g, trace)
+
+            if budget is not None and self.num_explored >= budget.next_check:
+                reason = budget.check(self.num_explored)
+                if reason is not None:
+                    if snapshot is not None:
+                        snapshot.save(frontier, best_g, trace)
+                    result = budget.exhausted(reason, self.num_explored, len(frontier))
+                    yield step.stopped(result)
+                    return result
+
             # Choose a node from the frontier
             node = frontier.remove()
+            if node.state in self.explored:
+                continue # Stale entry, a cheaper path to this state was already expanded
             self.num_explored += 1
 
-            if save_gif:
-                self.frames.append(self._get_current_image(show_explored=True))
-
             # If node is the goal, reconstruct the solution path
-            if node.state == self.goal:
-                actions = []
-                cells = []
-                while node.parent is not None:
-                    actions.append(node.action)
-                    cells.append(node.state)
-                    node = node.parent
-                    self.co_path += 1
-                actions.reverse()
-                cells.reverse()
-                self.solution = (actions, cells)
-                if save_gif:
-                    self.frames.append(self._get_current_image(show_solution=True, show_explored=True))
+            if node.state in goals:
+                goal = node.state
+                self.co_path = node.score_g
+
+                # Count the steps, then pack the moves into a Path on a second walk back
+                length = 0
+                current = node
+                while current.parent is not None:
+                    length += 1
+                    current = current.parent
+                self.solution = Path.from_reversed(goal, length, node_codes(node))
+                self.connected = (self.solution.start, goal)
+                if trace is not None:
+                    trace.solution = self.solution
+                if snapshot is not None:
+                    snapshot.remove()
+                yield step.found(goal, self.solution)
                 return
 
             # Mark node as explored
             self.explored.add(node.state)
+            if trace is not None:
+                trace.record(node.state)
+            if snapshot is not None:
+                snapshot.record(node.state)
 
             # Add neighbors to frontier
-            for action, state in self.neighbors(node.state):
-                if not frontier.contains_state(state) and state not in self.explored:
-                    score_g = node.score_g + 1
-                    if algo in ["a*", "greedy"]:
-                        # For A* and Greedy, we need to calculate the heuristic score
-                        score_h = self.heuristic(state, method)
-                    else:
-                        score_h = 0 # For BFS, DFS, and Uniform Cost, heuristic is not used
-
-                    child = Node(state=state, parent=node, action=action, score_g=score_g, score_h=score_h) 
-                    frontier.add(child)
-
-    def solve_bidirectional(self, save_gif=False):
-        """Solves the maze using bidirectional BFS."""
-        self.reset_state() # Ensure state is reset
+            for action, state in neighbors(node.state):
+                if state in self.explored:
+                    continue
+                score_g = node.score_g + self.cost(state)
+
+                if algo in ["a*", "uniform"]:
+                    # Cost-aware searches re-queue a state whenever a cheaper path to it turns up
+                    if score_g >= best_g.get(state, float("inf")):
+                        continue
+                    best_g[state] = score_g
+                elif frontier.contains_state(state):
+                    continue
+
+                if algo in ["a*", "greedy"]:
+                    # For A* and Greedy, we need to calculate the heuristic score
+                    score_h = h(state)
+                else:
+                    score_h = 0 # For BFS, DFS, and Uniform Cost, heuristic is not used
 
-        # Initialize frontiers for both directions
-        from frontiers import QueueFrontier
-        frontier_start = QueueFrontier()
-        frontier_goal = QueueFrontier()
+                child = Node(state=state, parent=node, action=action, score_g=score_g, score_h=score_h) 
+                frontier.add(child)
+
+            step.cell = node.state
+            yield step
+
+    def nearest_goals(self):
+        """
+        Returns a dict mapping every start to (nearest goal, path cost), or to
+        None if no goal is reachable from it. One multi-source Dijkstra seeded
+        with all goals answers every start at once instead of one solve per pair.
+        """
+        source = {}
+        distance = {}
+        queue = []
+        for goal in self.goals:
+            source[goal] = goal
+            distance[goal] = 0
+            queue.append((0, goal))
+
+        settled = CellSet(self.width, self.height)
+        while queue:
+            dist, state = heapq.heappop(queue)
+            if state in settled:
+                continue
+            settled.add(state)
+            # Searching backwards: stepping to a neighbor means the forward path enters this state
+            step = self.cost(state)
+            for _, neighbor in self.neighbors(state):
+                if dist + step < distance.get(neighbor, float("inf")):
+                    source[neighbor] = source[state]
+                    distance[neighbor] = dist + step
+                    heapq.heappush(queue, (dist + step, neighbor))
+
+        return {
+            start: (source[start], distance[start]) if start in source else None
+            for start in self.starts
+        }
+
+    def solve_portfolio(self, configs=None, optimal=False, timeout=None, budget=None):
+        """
+        Races several (algorithm, heuristic) configurations in parallel worker
+        processes and keeps the first solution, or the first optimal one if
+        optimal=True. The report of the race is stored in self.portfolio_report;
+        its result is set when the optional SearchBudget or the timeout
+        (seconds) ended the race.
+        """
+        from portfolio import solve_portfolio
+        self.reset_state()
+        self.portfolio_report = solve_portfolio(self, configs, optimal, timeout, budget)
+        return self.portfolio_report
 
-        # Nodes for start and goal
-        start_node = Node(state=self.start, parent=None, action=None)
-        goal_node = Node(state=self.goal, parent=None, action=None)
+    def solve_parallel_bfs(self, workers=None, budget=None):
+        """
+        Solves the maze with a level-synchronous BFS whose wide layers are
+        split across worker processes sharing the grid and distance array in
+        shared memory; narrow layers, which is all of them in generated
+        mazes, are expanded serially (see parallel_bfs.py). Finds a path of
+        the same length as solve("bfs"). budget is an optional SearchBudget,
+        checked between layers.
+        """
+        from parallel_bfs import parallel_bfs
+        self.reset_state()
+        return parallel_bfs(self, workers, budget=budget)
 
-        frontier_start.add(start_node)
-        frontier_goal.add(goal_node)
+    def rectangle_decomposition(self):
+        """Returns the rectangular symmetry reduction of the maze, building it once."""
+        if self.rectangles is None:
+            from rsr import RectangleDecomposition
+            self.rectangles = RectangleDecomposition(self)
+        return self.rectangles
 
-        # To keep track of explored nodes and their corresponding Node objects from both sides
-        explored_start_nodes = {self.start: start_node}
-        explored_goal_nodes = {self.goal: goal_node}
-        
-        # For GIF visualization
-        if save_gif:
-            self.frames.append(self._get_current_image(show_explored=True))
-
-        while not frontier_start.empty() and not frontier_goal.empty():
-            # Alternate expansion between start and goal frontiers
-
-            # Expand from start side
-            current_start = frontier_start.remove()
-            self.explored.add(current_start.state) 
-            self.num_explored += 1 # Increment explored count
-
-            if save_gif:
-                self.frames.append(self._get_current_image(show_explored=True))
-
-            # Check for meeting point
-            if current_start.state in explored_goal_nodes:
-                meet_node_from_goal_side = explored_goal_nodes[current_start.state]
-                self._reconstruct_bidirectional_path(current_start, meet_node_from_goal_side)
-                if save_gif:
-                    self.frames.append(self._get_current_image(show_solution=True, show_explored=True))
-                return
+    def dead_end_filling(self):
+        """
+        Returns the walls with every dead end sealed (see deadends.py),
+        building them once per maze and set of starts and goals.
+        """
+        endpoints = (tuple(self.starts), tuple(self.goals))
+        if self.dead_ends is None or self.dead_ends.endpoints != endpoints:
+            from deadends import DeadEndMask
+            self.dead_ends = DeadEndMask(self)
+        return self.dead_ends
 
-            # Add neighbors to start frontier
-            for action, state in self.neighbors(current_start.state):
-                if state not in explored_start_nodes:
-                    new_node = Node(state=state, parent=current_start, action=action)
-                    explored_start_nodes[state] = new_node
-                    frontier_start.add(new_node)
+    def solve_rsr(self, method="manhattan", budget=None):
+        """
+        Solves the maze with A* on the graph left by rectangular symmetry
+        reduction: only the perimeters of maximal empty rectangles are
+        searched. Finds an optimal path on unweighted mazes.
+        """
+        from rsr import solve_rsr
+        self.reset_state()
+        return solve_rsr(self, method, budget)
 
-            # Expand from goal side
-            current_goal = frontier_goal.remove()
-            self.explored.add(current_goal.state)
-            self.num_explored += 1
+    def incremental_planner(self, method="manhattan"):
+        """
+        Returns an LPA* planner bound to this maze. Use its set_wall() to edit
+        walls and its solve() to re-plan without discarding earlier search work.
+        """
+        from incremental import IncrementalPlanner
+        return IncrementalPlanner(self, method)
 
-            if save_gif:
-                self.frames.append(self._get_current_image(show_explored=True))
+    def iter_anytime(self, method="manhattan", time_budget=None, weight=3.0, weight_step=0.5):
+        """
+        Anytime search (ARA*): yields an AnytimeSolution for every improved
+        path, each with its suboptimality bound, until the path is optimal or
+        time_budget (seconds) runs out.
+        """
+        from anytime import AnytimePlanner
+        planner = AnytimePlanner(self, method, weight, weight_step, time_budget)
+        return planner.solutions()
 
-            # Check for meeting point
-            if current_goal.state in explored_start_nodes:
-                meet_node_from_start_side = explored_start_nodes[current_goal.state]
-                self._reconstruct_bidirectional_path(meet_node_from_start_side, current_goal)
-                if save_gif:
-                    self.frames.append(self._get_current_image(show_solution=True, show_explored=True))
-                return
+    def solve_anytime(self, method="manhattan", time_budget=None, weight=3.0, weight_step=0.5, callback=None):
+        """
+        Solves the maze with ARA* and keeps the best path found within
+        time_budget seconds. callback, if given, is called with every
+        AnytimeSolution as it is found. Returns the last (best) solution.
+        """
+        from anytime import AnytimePlanner
+        self.reset_state()
+        planner = AnytimePlanner(self, method, weight, weight_step, time_budget)
 
-            # Add neighbors to goal frontier
-            for action, state in self.neighbors(current_goal.state):
-                if state not in explored_goal_nodes:
-                    new_node = Node(state=state, parent=current_goal, action=action)
-                    explored_goal_nodes[state] = new_node
-                    frontier_goal.add(new_node)
+        best = None
+        for result in planner.solutions():
+            best = result
+            if callback is not None:
+                callback(result)
+
+        self.num_explored = planner.num_explored
+        self.explored = planner.explored
+        if best is None:
+            raise Exception("no solution found within the time budget")
+
+        self.solution = best.path
+        self.co_path = best.cost
+        return best
+
+    def solve_bidirectional(self, save_gif=False, budget=None):
+        """
+        Solves the maze using bidirectional BFS. budget is an optional
+        SearchBudget, see solve().
+        """
+        return run_steps(self._iter_bidirectional(save_gif, budget, SearchStep(self)))
+
+    def _iter_bidirectional(self, save_gif, budget, step, prune=False):
+        # Bidirectional BFS as a step generator, see iter_solve
+        self.reset_state() # Ensure state is reset
+        neighbors = self.dead_end_filling().neighbors if prune else self.neighbors
+
+        # Initialize frontiers for both directions
+        frontier_start = deque()
+        frontier_goal = deque()
+        step.frontiers = (frontier_start, frontier_goal)
+
+        # Each side remembers the cells it has reached in a bitset and, per cell
+        # id, the code of the move that reached it (none for the seeds) instead
+        # of Nodes, in a dict sized by the search rather than by the maze
+        seen_start = CellSet(self.width, self.height)
+        seen_goal = CellSet(self.width, self.height)
+        moves_start = {}
+        moves_goal = {}
+
+        # Seed one side with every start and the other with every goal
+        for state in self.starts:
+            seen_start.add(state)
+            frontier_start.append(state)
+        for state in self.goals:
+            seen_goal.add(state)
+            frontier_goal.append(state)
         
-        # If no solution is found
-        raise Exception("No solution found by bidirectional search.")
+        # For GIF visualization
+        trace = SearchTrace(self.width, self.height) if save_gif else None
+        self.trace = trace
 
-    def _reconstruct_bidirectional_path(self, node_from_start_side, node_from_goal_side):
+        # A start that is also a goal is a meeting before any move
+        meeting = next((state for state in self.starts if state in seen_goal), None)
+        if meeting is not None:
+            self.explored.add(meeting)
+            self.num_explored += 1
+            if trace is not None:
+                trace.record(meeting)
+
+        # Expand one whole BFS layer at a time, alternating sides, and look
+        # for the other side's cells as neighbors are generated. While the
+        # two seen sets are disjoint every path is longer than the sum of
+        # the two search depths, so the first cell both sides reach lies on
+        # a shortest path, whatever the number of starts and goals
+        forward = True
+        while meeting is None and frontier_start and frontier_goal:
+            if forward:
+                frontier, seen, moves, other = frontier_start, seen_start, moves_start, seen_goal
+            else:
+                frontier, seen, moves, other = frontier_goal, seen_goal, moves_goal, seen_start
+
+            for _ in range(len(frontier)):
+                if budget is not None and self.num_explored >= budget.next_check:
+                    reason = budget.check(self.num_explored)
+                    if reason is not None:
+                        result = budget.exhausted(reason, self.num_explored, len(frontier_start) + len(frontier_goal))
+                        yield step.stopped(result)
+                        return result
+
+                current = frontier.popleft()
+                self.explored.add(current)
+                self.num_explored += 1 # Increment explored count
+                if trace is not None:
+                    trace.record(current)
+
+                # Add neighbors to this side's frontier, stopping at the first one the other side has seen
+                for action, state in neighbors(current):
+                    if state not in seen:
+                        seen.add(state)
+                        moves[state[0] * self.width + state[1]] = CODES[action]
+                        frontier.append(state)
+                        if state in other:
+                            meeting = state
+                            break
+
+                step.cell = current
+                yield step
+                if meeting is not None:
+                    break
+            forward = not forward
+
+        if meeting is None:
+            raise Exception("No solution found by bidirectional search.")
+
+        self._reconstruct_bidirectional_path(meeting, moves_start, moves_goal)
+        if trace is not None:
+            trace.solution = self.solution
+        yield step.found(meeting, self.solution)
+
+    def _reconstruct_bidirectional_path(self, meeting_cell, moves_start, moves_goal):
         """
         Reconstructs the full path from the start to the goal by merging
         the two paths found by bidirectional search.
         """
-        path_start = []
-        current = node_from_start_side
-        while current.parent is not None:
-            path_start.append(current.action)
-            current = current.parent
-        path_start.reverse() # Reverse to get path from start to meeting point
-
-        path_goal = []
-        current = node_from_goal_side
-        while current.parent is not None:
-            # Reverse actions for the path from the goal side
-            if current.action == "up":
-                path_goal.append("down")
-            elif current.action == "down":
-                path_goal.append("up")
-            elif current.action == "left":
-                path_goal.append("right")
-            elif current.action == "right":
-                path_goal.append("left")
-            current = current.parent
-
-        full_path_actions = path_start + path_goal
-
-        # Reconstruct the full path of cells
-        full_path_cells = []
-        current_state = self.start
-        full_path_cells.append(current_state)
-        for action in full_path_actions:
-            if action == "up":
-                current_state = (current_state[0] - 1, current_state[1])
-            elif action == "down":
-                current_state = (current_state[0] + 1, current_state[1])
-            elif action == "left":
-                current_state = (current_state[0], current_state[1] - 1)
-            elif action == "right":
-                current_state = (current_state[0], current_state[1] + 1)
-            full_path_cells.append(current_state)
-        
-        # Store the solution in the maze properties
-        self.solution = (full_path_actions, full_path_cells)
-        self.co_path = len(full_path_actions)
-
-    def _get_current_image(self, show_solution=False, show_explored=False):
-        """
-        Creates and returns a PIL Image of the current maze state.
-        This is a helper function for GIF generation.
-        """
-        cell_size = 50
-        cell_border = 2
-
-        img = Image.new(
-            "RGBA",
-            (self.width * cell_size, self.height * cell_size),
-            "black"
-        )
-        draw = ImageDraw.Draw(img)
-
-        solution = self.solution[1] if self.solution is not None else None
-        for i, row in enumerate(self.walls):
-            for j, col in enumerate(row):
-                if col:
-                    fill = (40, 40, 40)              # Wall
-                elif (i, j) == self.start:
-                    fill = (255, 0, 0)               # Start
-                elif (i, j) == self.goal:
-                    fill = (0, 171, 28)              # Goal
-                elif solution is not None and show_solution and (i, j) in solution:
-                    fill = (220, 235, 113)           # Solution path
-                elif show_explored and (i, j) in self.explored:
-                    fill = (212, 97, 85)             # Explored node
-                else:
-                    fill = (237, 240, 252)           # Empty cell
+        # Start side: follow the recorded move codes back to the seed (last move first)
+        codes = bytearray()
+        row, col = meeting_cell
+        code = moves_start.get(row * self.width + col)
+        while code is not None:
+            codes.append(code)
+            d_row, d_col = DELTAS[ACTIONS[code]]
+            row, col = row - d_row, col - d_col
+            code = moves_start.get(row * self.width + col)
+        path = Path.from_reversed(meeting_cell, len(codes), codes)
+
+        # Goal side: the goal search moved away from the goal, so walk its moves in reverse
+        row, col = meeting_cell
+        code = moves_goal.get(row * self.width + col)
+        while code is not None:
+            action = ACTIONS[code]
+            path.append(OPPOSITE[action])
+            d_row, d_col = DELTAS[action]
+            row, col = row - d_row, col - d_col
+            code = moves_goal.get(row * self.width + col)
 
-                draw.rectangle(
-                    ([(j * cell_size + cell_border, i * cell_size + cell_border),
-                      ((j + 1) * cell_size - cell_border, (i + 1) * cell_size - cell_border)]),
-                    fill=fill
-                )
-        return img
+        # Store the solution in the maze properties
+        self.solution = path
+        self.co_path = sum(self.cost(cell) for cell in path.iter_cells())
+        self.connected = (path.start, (row, col))
 
     def output_image(self, filename, show_solution=True, show_explored=False):
         # Save an image of the maze with the solution and/or explored nodes
-        cell_size = 50
-        cell_border = 2
-
-        # Create a blank canvas
-        img = Image.new(
-            "RGBA",
-            (self.width * cell_size, self.height * cell_size),
-            "black"
-        )
-        draw = ImageDraw.Draw(img)
-
-        solution = self.solution[1] if self.solution is not None else None
-        for i, row in enumerate(self.walls):
-            for j, col in enumerate(row):
-                # Walls
-                if col:
-                    fill = (40, 40, 40)
-                # Start
-                elif (i, j) == self.start:
-                    fill = (255, 0, 0)
-                # Goal
-                elif (i, j) == self.goal:
-                    fill = (0, 171, 28)
-                # Solution
-                elif solution is not None and show_solution and (i, j) in solution:
-                    fill = (220, 235, 113)
-                # Explored
-                elif solution is not None and show_explored and (i, j) in self.explored:
-                    fill = (212, 97, 85)
-                # Empty cell
-                else:
-                    fill = (237, 240, 252)
-
-                # Draw cell
-                draw.rectangle(
-                    ([(j * cell_size + cell_border, i * cell_size + cell_border),
-                      ((j + 1) * cell_size - cell_border, (i + 1) * cell_size - cell_border)]),
-                    fill=fill
-                )
-
-        img.save(filename)
+        import render
+        render.save_image(self, filename, show_solution=show_solution, show_explored=show_explored)
 
     def get_state_image(self, cell_size=30):
         """
         Returns a Tkinter PhotoImage of the current maze state
         """
-        img = Image.new("RGB", (self.width*cell_size, self.height*cell_size), "white")
-        draw = ImageDraw.Draw(img)
-    
-        for i, row in enumerate(self.walls):
-            for j, col in enumerate(row):
-                x1, y1 = j*cell_size, i*cell_size
-                x2, y2 = x1+cell_size, y1+cell_size
-            
-                if col:
-                    draw.rectangle([x1, y1, x2, y2], fill="black")
-                elif (i, j) == self.start:
-                    draw.rectangle([x1, y1, x2, y2], fill="red")
-                elif (i, j) == self.goal:
-                    draw.rectangle([x1, y1, x2, y2], fill="green")
-                elif self.solution and (i, j) in self.solution[1]:
-                    draw.rectangle([x1, y1, x2, y2], fill="blue")
-                elif hasattr(self, 'explored') and (i, j) in self.explored:
-                    draw.rectangle([x1, y1, x2, y2], fill="gray")
-    
-        return ImageTk.PhotoImage(img)
-
-    def save_solution_gif(self, gif_path="maze_solution.gif", frame_delay=250):
+        import render
+        return render.tk_image(self, cell_size)
+
+    def save_solution_gif(self, gif_path="maze_solution.gif", frame_delay=250, workers=None, trace=None):
         """
         Generate and save an animated GIF of the maze solving process.
-        This method uses the frames collected during the last call to solve().
+        This method replays the trace recorded by the last call to
+        solve(save_gif=True), or the given trace, rendering frame ranges in
+        parallel worker processes.
+        """
+        trace = self.trace if trace is None else trace
+        if trace is None:
+            raise Exception("No search trace available. Please solve the maze with save_gif=True.")
+        import render
+        render.save_trace_gif(self, trace, gif_path, frame_delay, workers)
+
+    def export_solution(self, filename, fmt="cells", include_start=True):
+        """
+        Streams the solution path to a text file without building lists of
+        cells or actions. fmt is "cells" (row,col per line), "actions" (one
+        action per line) or "letters" (a single line of U/D/L/R).
         """
-        if not self.frames:
-            # If no frames were collected, generate frames now
-            raise Exception("No frames available. Please solve the maze with frame collection enabled.")
-        imageio.mimsave(gif_path, self.frames, fps=1000/frame_delay)
+        if self.solution is None:
+            raise Exception("No solution available. Please solve the maze first.")
+        with open(filename, "w") as f:
+            self.solution.write(f, fmt=fmt, include_start=include_start)
 
     def save_to_file(self, filename="generated_maze.txt"):
         """
         Saves the current maze configuration to a text file.
         'A' represents the start, 'B' represents the goal,
-        ' ' (space) represents a path, and '#' represents a wall.
+        ' ' (space) represents a path, '#' represents a wall and
+        the digits 2-9 represent weighted terrain.
         """
         try:
+            starts = set(self.starts)
+            goals = set(self.goals)
             with open(filename, "w") as f:
                 for r in range(self.height):
                     row_str = ""
                     for c in range(self.width):
-                        if (r, c) == self.start:
+                        if (r, c) in starts:
                             row_str += "A"
-                        elif (r, c) == self.goal:
+                        elif (r, c) in goals:
                             row_str += "B"
                         elif self.walls[r][c]:
                             row_str += "#"
+                        elif self.costs is not None and self.costs[r][c] > 1:
+                            row_str += str(self.costs[r][c])
                         else:
                             row_str += " "
                     f.write(row_str + "\n")
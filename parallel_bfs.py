@@ -0,0 +1,191 @@
+import multiprocessing
+import multiprocessing.util
+import os
+from array import array
+from multiprocessing import shared_memory
+from path import Path, CODES, OPPOSITE
+from budget import MAX_EXPANSIONS
+
+# Set in every worker (and in the parent) by _attach()
+_walls = None
+_dist = None
+_width = 0
+_height = 0
+_segments = []
+
+
+def _attach(walls_name, dist_name, width, height):
+    # Map the shared wall grid and distance array into this process
+    global _walls, _dist, _width, _height, _segments
+    _detach() # Forked workers inherit the parent's mapping; drop it first
+    walls_shm = shared_memory.SharedMemory(name=walls_name)
+    dist_shm = shared_memory.SharedMemory(name=dist_name)
+    _segments = [walls_shm, dist_shm]
+    _walls = walls_shm.buf
+    _dist = dist_shm.buf.cast("i")
+    _width = width
+    _height = height
+
+
+def _attach_worker(walls_name, dist_name, width, height):
+    # Pool initializer: the views must be released before the segments are closed at exit
+    _attach(walls_name, dist_name, width, height)
+    multiprocessing.util.Finalize(None, _detach, exitpriority=10)
+
+
+def _detach():
+    global _walls, _dist, _segments
+    if _dist is not None:
+        _dist.release()
+    _walls = _dist = None
+    for segment in _segments:
+        segment.close()
+    _segments = []
+
+
+def _expand(args):
+    """
+    Expands one slice of the current BFS layer. Unvisited open neighbors are
+    stamped with the next distance in the shared array and returned. Two
+    workers may both claim the same cell; they write the same value, and the
+    parent drops the duplicate when it merges the layer.
+    """
+    chunk, level = args
+    walls, dist, width, height = _walls, _dist, _width, _height
+    last_row = (height - 1) * width
+    following = level + 1
+    found = array("q")
+    for cell in chunk:
+        col = cell % width
+        if cell >= width:
+            neighbor = cell - width
+            if not walls[neighbor] and dist[neighbor] < 0:
+                dist[neighbor] = following
+                found.append(neighbor)
+        if cell < last_row:
+            neighbor = cell + width
+            if not walls[neighbor] and dist[neighbor] < 0:
+                dist[neighbor] = following
+                found.append(neighbor)
+        if col > 0:
+            neighbor = cell - 1
+            if not walls[neighbor] and dist[neighbor] < 0:
+                dist[neighbor] = following
+                found.append(neighbor)
+        if col < width - 1:
+            neighbor = cell + 1
+            if not walls[neighbor] and dist[neighbor] < 0:
+                dist[neighbor] = following
+                found.append(neighbor)
+    return found
+
+
+def parallel_bfs(maze, workers=None, min_parallel=4096, budget=None):
+    """
+    Level-synchronous BFS over a wall grid and distance array kept in
+    multiprocessing.shared_memory. Each layer's frontier is split across the
+    worker processes, the discovered cells are merged into the next layer,
+    and the path is rebuilt from the distance array afterwards.
+
+    Layers smaller than min_parallel cells are expanded in the parent, where
+    the inter-process round trip (and the merge, which is serial) would
+    cost more than the work itself, and the worker pool is only started
+    once a layer reaches that size. The BFS layers of generated mazes stay
+    far below it (under a thousand cells on 1501x1501), so there the
+    search runs serially and is no faster with more workers; workers only
+    help on wide layers, such as open grids seeded from many starts.
+    Fills the maze's solution, co_path, num_explored, explored and connected
+    like Maze.solve("bfs").
+
+    budget is an optional SearchBudget, checked before every layer: a layer
+    that would take num_explored past max_expansions is not started. When
+    it stops the search, the BudgetExhausted is returned.
+    """
+    if maze.costs is not None:
+        raise Exception("parallel BFS only supports unweighted mazes")
+    if workers is None:
+        workers = os.cpu_count() or 1
+
+    width, height = maze.width, maze.height
+    cells = width * height
+    walls_shm = shared_memory.SharedMemory(create=True, size=cells)
+    dist_shm = shared_memory.SharedMemory(create=True, size=cells * 4)
+    pool = None
+    try:
+        walls_shm.buf[:cells] = bytes(wall for row in maze.walls for wall in row)
+        dist_shm.buf[:cells * 4] = b"\xff" * (cells * 4) # -1 marks unvisited cells
+
+        _attach(walls_shm.name, dist_shm.name, width, height)
+
+        frontier = array("q")
+        for row, col in maze.starts:
+            cell = row * width + col
+            _dist[cell] = 0
+            frontier.append(cell)
+        goals = [row * width + col for row, col in maze.goals]
+
+        level = 0
+        reached = None
+        while frontier:
+            reached = next((goal for goal in goals if _dist[goal] >= 0), None)
+            if reached is not None:
+                break
+
+            if budget is not None:
+                reason = budget.check(maze.num_explored)
+                if reason is None and budget.max_expansions is not None and \
+                        maze.num_explored + len(frontier) > budget.max_expansions:
+                    reason = MAX_EXPANSIONS
+                if reason is not None:
+                    return budget.exhausted(reason, maze.num_explored, len(frontier))
+
+            maze.num_explored += len(frontier)
+            for cell in frontier:
+                maze.explored.add_id(cell)
+
+            if workers > 1 and len(frontier) >= min_parallel:
+                if pool is None:
+                    pool = multiprocessing.Pool(
+                        workers, initializer=_attach_worker,
+                        initargs=(walls_shm.name, dist_shm.name, width, height)
+                    )
+                size = -(-len(frontier) // workers)
+                chunks = [(frontier[i:i + size], level) for i in range(0, len(frontier), size)]
+                frontier = array("q")
+                seen = set()
+                for found in pool.map(_expand, chunks):
+                    for cell in found:
+                        if cell not in seen:
+                            seen.add(cell)
+                            frontier.append(cell)
+            else:
+                frontier = _expand((frontier, level))
+            level += 1
+
+        if reached is None:
+            raise Exception("no solution")
+
+        # Walk back down the distance gradient from the goal to a start
+        codes = bytearray()
+        cell = reached
+        while _dist[cell] > 0:
+            for action, (r, c) in maze.neighbors(divmod(cell, width)):
+                neighbor = r * width + c
+                if _dist[neighbor] == _dist[cell] - 1:
+                    # The move from the neighbor back to this cell is the opposite action
+                    codes.append(CODES[OPPOSITE[action]])
+                    cell = neighbor
+                    break
+
+        maze.solution = Path.from_reversed(divmod(reached, width), len(codes), codes)
+        maze.co_path = len(codes)
+        maze.connected = (divmod(cell, width), divmod(reached, width))
+    finally:
+        if pool is not None:
+            pool.close()
+            pool.join()
+        _detach()
+        walls_shm.close()
+        walls_shm.unlink()
+        dist_shm.close()
+        dist_shm.unlink()
@@ -0,0 +1,248 @@
+"""
+Tiled parallel maze generation.
+
+The lattice of passage cells (even row, even column) is split into square
+tiles of tile_nodes x tile_nodes cells. Every tile is carved into its own
+spanning tree by a randomized DFS in a worker process, which then adds
+the tile's loops by opening each remaining wall between two passage cells
+(including the walls on its right and bottom borders) with probability
+loop_chance. The carved tiles are joined through a random spanning tree
+over the tile grid with exactly one opening in each chosen tile border,
+so with loop_chance=0 the whole maze is perfect.
+
+Each tile draws from its own generator seeded with (seed, tile), so the
+same seed gives the same maze for any number of workers.
+
+    python parallel_generate.py big.tiled --width 10001 --height 10001 --seed 1
+"""
+import argparse
+import multiprocessing
+import os
+import random
+import time
+from tiled import TiledWriter
+
+# Set before the pool forks, read by _carve_tile in the workers
+_job = None
+
+
+def _tile_rng(seed, tile_row, tile_col):
+    # str seeds are hashed with SHA-512, so this is stable across processes and runs
+    return random.Random(f"{seed}:{tile_row}:{tile_col}")
+
+
+def _carve_tile(tile):
+    """
+    Carves one tile and returns it as tile_size x tile_size cell bytes
+    (1 for open, 0 for wall), or writes it straight into the tiled file
+    when one is being generated.
+    """
+    tile_row, tile_col = tile
+    width, height, tile_nodes, seed, loop_chance, target = _job
+    nodes_down = (height + 1) // 2
+    nodes_across = (width + 1) // 2
+    first_row = tile_row * tile_nodes
+    first_col = tile_col * tile_nodes
+    rows = min(tile_nodes, nodes_down - first_row)
+    cols = min(tile_nodes, nodes_across - first_col)
+    size = 2 * tile_nodes
+    cells = bytearray(size * size)
+    rng = _tile_rng(seed, tile_row, tile_col)
+
+    # Randomized DFS over the tile's nodes, node (r, c) is local cell (2r, 2c)
+    visited = bytearray(rows * cols)
+    start = rng.randrange(rows * cols)
+    visited[start] = 1
+    r, c = divmod(start, cols)
+    cells[2 * r * size + 2 * c] = 1
+    stack = [start]
+    while stack:
+        r, c = divmod(stack[-1], cols)
+        candidates = []
+        if c + 1 < cols and not visited[r * cols + c + 1]:
+            candidates.append((r, c + 1))
+        if c > 0 and not visited[r * cols + c - 1]:
+            candidates.append((r, c - 1))
+        if r + 1 < rows and not visited[(r + 1) * cols + c]:
+            candidates.append((r + 1, c))
+        if r > 0 and not visited[(r - 1) * cols + c]:
+            candidates.append((r - 1, c))
+        if candidates:
+            next_r, next_c = rng.choice(candidates)
+            visited[next_r * cols + next_c] = 1
+            cells[(r + next_r) * size + c + next_c] = 1  # Wall between the two nodes
+            cells[2 * next_r * size + 2 * next_c] = 1
+            stack.append(next_r * cols + next_c)
+        else:
+            stack.pop()
+
+    # Loops: remaining walls between two nodes, including the tile's own
+    # right and bottom borders (the neighbor tile's nodes are always open)
+    if loop_chance > 0:
+        for r in range(rows):
+            for c in range(cols):
+                base = 2 * r * size + 2 * c
+                if first_col + c + 1 < nodes_across and not cells[base + 1] and rng.random() < loop_chance:
+                    cells[base + 1] = 1
+                if first_row + r + 1 < nodes_down and not cells[base + size] and rng.random() < loop_chance:
+                    cells[base + size] = 1
+
+    # Cells past the right or bottom edge of the maze stay walls
+    last_row = min(size, height - 2 * first_row)
+    last_col = min(size, width - 2 * first_col)
+    if last_col < size or last_row < size:
+        for r in range(size):
+            if r >= last_row:
+                cells[r * size:(r + 1) * size] = bytes(size)
+            else:
+                cells[r * size + last_col:(r + 1) * size] = bytes(size - last_col)
+
+    if target is None:
+        return tile, bytes(cells)
+    filename, header_size, tile_bytes, tiles_across = target
+    with open(filename, "r+b") as f:
+        os.pwrite(f.fileno(), cells, header_size + (tile_row * tiles_across + tile_col) * tile_bytes)
+    return tile, None
+
+
+def _tile_tree(seed, tiles_down, tiles_across):
+    """Random spanning tree over the tile grid, returns one opening cell per tree edge."""
+    rng = random.Random(f"{seed}:tiles")
+    visited = bytearray(tiles_down * tiles_across)
+    start = rng.randrange(tiles_down * tiles_across)
+    visited[start] = 1
+    stack = [start]
+    edges = []
+    while stack:
+        r, c = divmod(stack[-1], tiles_across)
+        candidates = [
+            (nr, nc) for nr, nc in ((r, c + 1), (r, c - 1), (r + 1, c), (r - 1, c))
+            if 0 <= nr < tiles_down and 0 <= nc < tiles_across and not visited[nr * tiles_across + nc]
+        ]
+        if candidates:
+            nr, nc = rng.choice(candidates)
+            visited[nr * tiles_across + nc] = 1
+            edges.append(((r, c), (nr, nc)))
+            stack.append(nr * tiles_across + nc)
+        else:
+            stack.pop()
+    return edges, rng
+
+
+def _openings(width, height, tile_nodes, seed):
+    # One opening cell on the border of each pair of tiles joined by the tile tree
+    nodes_down = (height + 1) // 2
+    nodes_across = (width + 1) // 2
+    tiles_down = -(-nodes_down // tile_nodes)
+    tiles_across = -(-nodes_across // tile_nodes)
+    edges, rng = _tile_tree(seed, tiles_down, tiles_across)
+    openings = []
+    for (r, c), (nr, nc) in edges:
+        top, left = min(r, nr), min(c, nc)
+        if r == nr:
+            # Side by side: open the wall column right of the left tile, at one of its node rows
+            node_row = rng.randrange(top * tile_nodes, min((top + 1) * tile_nodes, nodes_down))
+            openings.append((2 * node_row, 2 * (left + 1) * tile_nodes - 1))
+        else:
+            node_col = rng.randrange(left * tile_nodes, min((left + 1) * tile_nodes, nodes_across))
+            openings.append((2 * (top + 1) * tile_nodes - 1, 2 * node_col))
+    return openings
+
+
+def _endpoints(width, height, seed):
+    # Distinct start and goal nodes; every node is reachable in a perfect maze
+    nodes_down = (height + 1) // 2
+    nodes_across = (width + 1) // 2
+    if nodes_down * nodes_across < 2:
+        # A single node has to be both, as in Maze.generate_maze
+        if height > 1 or width > 1:
+            return (0, 0), (0, 0)
+        raise Exception("Maze too small to have distinct start and goal.")
+    rng = random.Random(f"{seed}:endpoints")
+    start, goal = rng.sample(range(nodes_down * nodes_across), 2)
+    start = divmod(start, nodes_across)
+    goal = divmod(goal, nodes_across)
+    return (2 * start[0], 2 * start[1]), (2 * goal[0], 2 * goal[1])
+
+
+def _run(width, height, tile_nodes, seed, loop_chance, workers, target):
+    # Carve every tile, in worker processes when there is more than one tile
+    global _job
+    tiles_down = -(-((height + 1) // 2) // tile_nodes)
+    tiles_across = -(-((width + 1) // 2) // tile_nodes)
+    tiles = [(r, c) for r in range(tiles_down) for c in range(tiles_across)]
+    _job = (width, height, tile_nodes, seed, loop_chance, target)
+    try:
+        workers = workers or os.cpu_count() or 1
+        if workers == 1 or len(tiles) == 1 or "fork" not in multiprocessing.get_all_start_methods():
+            yield from map(_carve_tile, tiles)
+        else:
+            with multiprocessing.get_context("fork").Pool(workers) as pool:
+                yield from pool.imap_unordered(_carve_tile, tiles, chunksize=max(1, len(tiles) // (workers * 8)))
+    finally:
+        _job = None
+
+
+def generate_walls(width, height, seed, tile_nodes=32, loop_chance=0.1, workers=None):
+    """
+    Generates a maze in memory. Returns (walls, start, goal) with walls as
+    the list of rows of booleans that Maze uses.
+    """
+    size = 2 * tile_nodes
+    tiles_across = -(-((width + 1) // 2) // tile_nodes)
+    walls = [None] * height
+    for (tile_row, tile_col), cells in _run(width, height, tile_nodes, seed, loop_chance, workers, None):
+        left = tile_col * size
+        for r in range(min(size, height - tile_row * size)):
+            row = tile_row * size + r
+            if walls[row] is None:
+                walls[row] = bytearray(tiles_across * size)
+            walls[row][left:left + size] = cells[r * size:(r + 1) * size]
+
+    for row, col in _openings(width, height, tile_nodes, seed):
+        walls[row][col] = 1
+    walls = [[not cell for cell in row[:width]] for row in walls]
+    start, goal = _endpoints(width, height, seed)
+    return walls, start, goal
+
+
+def generate_tiled(filename, width, height, seed, tile_nodes=32, loop_chance=0.1, workers=None):
+    """
+    Generates a maze straight into a tiled maze file (see tiled.py) with
+    tile_size 2 * tile_nodes, so each worker writes exactly one file tile
+    and the maze never has to fit in memory.
+    """
+    start, goal = _endpoints(width, height, seed)
+    with TiledWriter(filename, width, height, [start], [goal], 2 * tile_nodes) as writer:
+        target = (filename, writer.header_size, writer.tile_bytes, writer.tiles_across)
+
+    for _ in _run(width, height, tile_nodes, seed, loop_chance, workers, target):
+        pass
+
+    # The workers are done with their tiles, now cut the openings between them
+    size = 2 * tile_nodes
+    with open(filename, "r+b") as f:
+        for row, col in _openings(width, height, tile_nodes, seed):
+            tile = (row // size) * target[3] + col // size
+            offset = target[1] + tile * target[2] + (row % size) * size + col % size
+            os.pwrite(f.fileno(), b"\x01", offset)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate a large maze into a tiled maze file using worker processes.")
+    parser.add_argument("filename")
+    parser.add_argument("--width", type=int, required=True)
+    parser.add_argument("--height", type=int, required=True)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--tile-nodes", type=int, default=32, help="passage cells per tile side")
+    parser.add_argument("--loop-chance", type=float, default=0.1)
+    parser.add_argument("--workers", type=int, default=None)
+    args = parser.parse_args()
+
+    start_time = time.perf_counter()
+    generate_tiled(args.filename, args.width, args.height, args.seed, args.tile_nodes, args.loop_chance, args.workers)
+    print(f"Generated {args.width}x{args.height} maze in {time.perf_counter() - start_time:.2f} seconds")
+
+
+if __name__ == "__main__":
+    main()
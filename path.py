@@ -0,0 +1,174 @@
+# Moves on the grid, in the order of their 2-bit path codes
+ACTIONS = ("up", "down", "left", "right")
+CODES = {action: code for code, action in enumerate(ACTIONS)}
+DELTAS = {"up": (-1, 0), "down": (1, 0), "left": (0, -1), "right": (0, 1)}
+OPPOSITE = {"up": "down", "down": "up", "left": "right", "right": "left"}
+
+_ROW_STEP = (-1, 1, 0, 0)
+_COL_STEP = (0, 0, -1, 1)
+_LETTERS = "UDLR"
+
+
+class Path():
+    """
+    A solution path stored as 2-bit direction codes (four steps per byte)
+    from a start cell, instead of parallel lists of action strings and cell
+    tuples. Actions and cells are decoded lazily.
+
+    For compatibility with the old (actions, cells) tuple, path[0] and
+    path[1] return the two lazy views and `actions, cells = path` works.
+    Like Maze.solve always did, the cells exclude the start cell.
+    """
+    def __init__(self, start):
+        self.start = start
+        self.data = bytearray()
+        self.length = 0
+
+    @classmethod
+    def from_actions(cls, start, actions):
+        path = cls(start)
+        for action in actions:
+            path.append_code(CODES[action])
+        return path
+
+    @classmethod
+    def from_reversed(cls, end, length, codes):
+        """
+        Builds a path of known length from codes given last step first, as
+        produced by following parent links back from the goal. end is the
+        final cell; the start is derived from it.
+        """
+        path = cls(None)
+        path.length = length
+        path.data = bytearray((length + 3) >> 2)
+        row, col = end
+        index = length
+        for code in codes:
+            index -= 1
+            path.data[index >> 2] |= code << ((index & 3) << 1)
+            row -= _ROW_STEP[code]
+            col -= _COL_STEP[code]
+        if index != 0:
+            raise Exception("path length does not match the number of codes")
+        path.start = (row, col)
+        return path
+
+    def append_code(self, code):
+        if self.length & 3 == 0:
+            self.data.append(0)
+        self.data[-1] |= code << ((self.length & 3) << 1)
+        self.length += 1
+
+    def append(self, action):
+        self.append_code(CODES[action])
+
+    def codes(self):
+        # Yield the 2-bit direction codes in order
+        remaining = self.length
+        for byte in self.data:
+            for shift in (0, 2, 4, 6):
+                if remaining == 0:
+                    return
+                yield byte >> shift & 3
+                remaining -= 1
+
+    def iter_actions(self):
+        for code in self.codes():
+            yield ACTIONS[code]
+
+    def iter_cells(self, include_start=False):
+        row, col = self.start
+        if include_start:
+            yield (row, col)
+        for code in self.codes():
+            row += _ROW_STEP[code]
+            col += _COL_STEP[code]
+            yield (row, col)
+
+    @property
+    def end(self):
+        row, col = self.start
+        for code in self.codes():
+            row += _ROW_STEP[code]
+            col += _COL_STEP[code]
+        return (row, col)
+
+    @property
+    def actions(self):
+        return PathView(self, self.iter_actions)
+
+    @property
+    def cells(self):
+        return PathView(self, self.iter_cells)
+
+    def __len__(self):
+        return self.length
+
+    def __bool__(self):
+        # A path is a found solution even when it has no steps
+        return True
+
+    def __getitem__(self, index):
+        return (self.actions, self.cells)[index]
+
+    def __iter__(self):
+        return iter((self.actions, self.cells))
+
+    def write(self, f, fmt="cells", include_start=True, chunk=4096):
+        """
+        Streams the path to an open text file without materializing it:
+        "cells" writes one "row,col" per line, "actions" one action per line,
+        and "letters" a single line of U/D/L/R characters.
+        """
+        if fmt == "cells":
+            lines = (f"{row},{col}\n" for row, col in self.iter_cells(include_start))
+        elif fmt == "actions":
+            lines = (action + "\n" for action in self.iter_actions())
+        elif fmt == "letters":
+            lines = (_LETTERS[code] for code in self.codes())
+        else:
+            raise Exception(f"unknown path format: {fmt}")
+
+        buffer = []
+        for line in lines:
+            buffer.append(line)
+            if len(buffer) >= chunk:
+                f.write("".join(buffer))
+                buffer = []
+        f.write("".join(buffer))
+        if fmt == "letters":
+            f.write("\n")
+
+    def __repr__(self):
+        return f"Path(start={self.start}, steps={self.length})"
+
+
+class PathView():
+    """Lazy, re-iterable view over a Path's actions or cells."""
+    def __init__(self, path, iterate):
+        self.path = path
+        self.iterate = iterate
+
+    def __iter__(self):
+        return self.iterate()
+
+    def __len__(self):
+        return self.path.length
+
+    def __contains__(self, item):
+        return any(value == item for value in self.iterate())
+
+    def __getitem__(self, index):
+        if index < 0:
+            index += self.path.length
+        if not 0 <= index < self.path.length:
+            raise IndexError("path index out of range")
+        for position, value in enumerate(self.iterate()):
+            if position == index:
+                return value
+
+    def __eq__(self, other):
+        return list(self) == list(other)
+
+    def __repr__(self):
+        return repr(list(self))
@@ -0,0 +1,164 @@
+import multiprocessing
+import queue
+import time
+from heuristics import admissible_names
+from budget import BudgetExhausted, MAX_EXPANSIONS, TIME_BUDGET, CANCELLED
+
+# Algorithm/heuristic combinations raced by default
+DEFAULT_CONFIGS = [
+    ("dfs", None),
+    ("greedy", "manhattan"),
+    ("bidirectional", None),
+    ("a*", "manhattan"),
+    ("bfs", None),
+]
+
+
+def is_optimal(maze, algo, method):
+    """Returns True if the algorithm/heuristic pair is guaranteed to find a cheapest path."""
+    if algo == "uniform":
+        return True
+    if algo == "a*":
+        return method in admissible_names()
+    if algo in ["bfs", "bidirectional"]:
+        return maze.costs is None # Both count steps, which only equals cost on unweighted mazes
+    return False
+
+
+def _worker(maze, index, algo, method, max_expansions, results):
+    # Runs one configuration and reports its outcome back to the parent
+    start_time = time.perf_counter()
+    try:
+        result = maze.solve(algo, method=method or "manhattan", max_expansions=max_expansions)
+        if result is not None:
+            results.put((index, "stopped", time.perf_counter() - start_time, (result.num_explored, result.frontier_size)))
+            return
+        results.put((index, "solved", time.perf_counter() - start_time, (
+            maze.solution, maze.co_path, maze.num_explored, maze.explored, maze.connected
+        )))
+    except Exception as e:
+        results.put((index, "failed", time.perf_counter() - start_time, str(e)))
+
+
+class PortfolioReport():
+    """
+    Outcome of a portfolio race: which configuration won and, for every
+    configuration, its status ("won", "solved", "failed", "stopped" by
+    its expansion limit, or "cancelled") and how long it had run. result
+    is the budget.BudgetExhausted when a budget or the timeout ended the
+    race without a winner; its counts add up the stopped configurations.
+    """
+    def __init__(self, configs):
+        self.configs = configs
+        self.winner = None
+        self.result = None
+        self.status = ["cancelled"] * len(configs)
+        self.elapsed = [None] * len(configs)
+
+    def __str__(self):
+        lines = []
+        for (algo, method), status, elapsed in zip(self.configs, self.status, self.elapsed):
+            name = f"{algo} ({method})" if method else algo
+            lines.append(f"{name:<26} {status:<10} {elapsed:.6f}s")
+        return "\n".join(lines)
+
+
+def solve_portfolio(maze, configs=None, optimal=False, timeout=None, budget=None):
+    """
+    Races several algorithm/heuristic configurations on the maze in parallel
+    worker processes and stores the first solution (or the first optimal one
+    when optimal=True) on the maze. The losers are terminated.
+
+    budget is an optional SearchBudget: every worker gets its expansion
+    limit, and the parent ends the race when the time budget runs out or
+    the cancel token is set. report.result then says why there is no
+    winner, as it does when timeout (seconds) runs out.
+
+    Workers are forked where the platform allows it, so they all read the
+    parent's single copy of the grid instead of receiving a pickled copy.
+    Returns a PortfolioReport.
+    """
+    if configs is None:
+        configs = DEFAULT_CONFIGS
+    if optimal and not any(is_optimal(maze, algo, method) for algo, method in configs):
+        raise Exception("portfolio has no configuration that guarantees an optimal path")
+
+    if "fork" in multiprocessing.get_all_start_methods():
+        context = multiprocessing.get_context("fork")
+    else:
+        context = multiprocessing.get_context()
+
+    report = PortfolioReport(configs)
+    results = context.Queue()
+    workers = []
+    for index, (algo, method) in enumerate(configs):
+        max_expansions = None if budget is None else budget.max_expansions
+        worker = context.Process(target=_worker, args=(maze, index, algo, method, max_expansions, results), daemon=True)
+        workers.append(worker)
+
+    launched = time.perf_counter()
+    for worker in workers:
+        worker.start()
+
+    deadline = None if timeout is None else launched + timeout
+    if budget is not None and budget.deadline is not None:
+        deadline = budget.deadline if deadline is None else min(deadline, budget.deadline)
+    cancel = None if budget is None else budget.cancel
+
+    winner = None
+    reason = None
+    num_explored = frontier_size = 0 # Summed over the stopped configurations
+    pending = len(workers)
+    try:
+        while pending and winner is None:
+            if cancel is not None and cancel.is_set():
+                reason = CANCELLED
+                break
+            remaining = None if deadline is None else deadline - time.perf_counter()
+            if remaining is not None and remaining <= 0:
+                reason = TIME_BUDGET
+                break
+            if cancel is not None:
+                # Wake up now and then to look at the cancel token
+                remaining = 0.05 if remaining is None else min(remaining, 0.05)
+            try:
+                index, status, elapsed, payload = results.get(timeout=remaining)
+            except queue.Empty:
+                continue
+            pending -= 1
+            report.status[index] = status
+            report.elapsed[index] = elapsed
+
+            if status == "stopped":
+                num_explored += payload[0]
+                frontier_size += payload[1]
+
+            algo, method = configs[index]
+            if status == "solved" and (not optimal or is_optimal(maze, algo, method)):
+                winner = index
+                report.winner = configs[index]
+                report.status[index] = "won"
+                maze.solution, maze.co_path, maze.num_explored, maze.explored, maze.connected = payload
+    finally:
+        # Cancel every configuration that is still running
+        cancelled_at = time.perf_counter() - launched
+        for index, worker in enumerate(workers):
+            if worker.is_alive():
+                worker.terminate()
+            if report.elapsed[index] is None:
+                report.elapsed[index] = cancelled_at
+        for worker in workers:
+            worker.join()
+
+    if winner is None and reason is None and "stopped" in report.status:
+        reason = MAX_EXPANSIONS
+    if winner is None and reason is not None:
+        maze.num_explored = num_explored
+        if budget is not None:
+            report.result = budget.exhausted(reason, num_explored, frontier_size)
+        else:
+            report.result = BudgetExhausted(reason, num_explored, frontier_size, time.perf_counter() - launched)
+        return report
+    if winner is None:
+        raise Exception("no solution found by any portfolio configuration")
+    return report
@@ -0,0 +1,233 @@
+import io
+import multiprocessing
+import struct
+from PIL import Image, ImageDraw
+
+# Rendering of mazes to PIL images, PNG/GIF files and Tk images.
+# maze.py imports this module on first use, so headless solving never
+# pays for PIL or Tk.
+
+CELL_SIZE = 50
+CELL_BORDER = 2
+
+SOLUTION_FILL = (220, 235, 113)
+EXPLORED_FILL = (212, 97, 85)
+
+_replay = None # (maze, trace) being rendered, inherited by forked workers
+
+
+def terrain_color(cost):
+    """RGB shade for a weighted cell: darker brown for more expensive terrain."""
+    t = min(cost - 1, 8) / 8
+    return (
+        int(237 + (120 - 237) * t),
+        int(240 + (85 - 240) * t),
+        int(252 + (50 - 252) * t)
+    )
+
+
+def _draw_cells(maze, draw, show_solution, show_explored):
+    # Paint every cell of the maze as a bordered square
+    solution = set(maze.solution[1]) if maze.solution is not None and show_solution else None
+    starts = set(maze.starts)
+    goals = set(maze.goals)
+    for i, row in enumerate(maze.walls):
+        for j, col in enumerate(row):
+            if col:
+                fill = (40, 40, 40)              # Wall
+            elif (i, j) in starts:
+                fill = (255, 0, 0)               # Start
+            elif (i, j) in goals:
+                fill = (0, 171, 28)              # Goal
+            elif solution is not None and (i, j) in solution:
+                fill = SOLUTION_FILL             # Solution path
+            elif show_explored and (i, j) in maze.explored:
+                fill = EXPLORED_FILL             # Explored node
+            elif maze.costs is not None and maze.costs[i][j] > 1:
+                fill = terrain_color(maze.costs[i][j])  # Weighted terrain
+            else:
+                fill = (237, 240, 252)           # Empty cell
+
+            _paint(draw, i, j, fill)
+
+
+def _paint(draw, i, j, fill):
+    draw.rectangle(
+        ([(j * CELL_SIZE + CELL_BORDER, i * CELL_SIZE + CELL_BORDER),
+          ((j + 1) * CELL_SIZE - CELL_BORDER, (i + 1) * CELL_SIZE - CELL_BORDER)]),
+        fill=fill
+    )
+
+
+def maze_image(maze, show_solution=False, show_explored=False):
+    """Returns a PIL Image of the current maze state (used for GIF frames)."""
+    img = Image.new(
+        "RGBA",
+        (maze.width * CELL_SIZE, maze.height * CELL_SIZE),
+        "black"
+    )
+    _draw_cells(maze, ImageDraw.Draw(img), show_solution, show_explored)
+    return img
+
+
+def save_image(maze, filename, show_solution=True, show_explored=False):
+    # Save an image of the maze with the solution and/or explored nodes
+    # (explored nodes are only shown once the maze has been solved)
+    show_explored = show_explored and maze.solution is not None
+    maze_image(maze, show_solution, show_explored).save(filename)
+
+
+def tk_image(maze, cell_size=30):
+    """Returns a Tkinter PhotoImage of the current maze state."""
+    from PIL import ImageTk # Pulls in Tk, so only load it when a Tk image is wanted
+
+    img = Image.new("RGB", (maze.width*cell_size, maze.height*cell_size), "white")
+    draw = ImageDraw.Draw(img)
+    solution = set(maze.solution[1]) if maze.solution else set()
+    starts = set(maze.starts)
+    goals = set(maze.goals)
+
+    for i, row in enumerate(maze.walls):
+        for j, col in enumerate(row):
+            x1, y1 = j*cell_size, i*cell_size
+            x2, y2 = x1+cell_size, y1+cell_size
+
+            if col:
+                draw.rectangle([x1, y1, x2, y2], fill="black")
+            elif (i, j) in starts:
+                draw.rectangle([x1, y1, x2, y2], fill="red")
+            elif (i, j) in goals:
+                draw.rectangle([x1, y1, x2, y2], fill="green")
+            elif (i, j) in solution:
+                draw.rectangle([x1, y1, x2, y2], fill="blue")
+            elif (i, j) in maze.explored:
+                draw.rectangle([x1, y1, x2, y2], fill="gray")
+            elif maze.costs is not None and maze.costs[i][j] > 1:
+                draw.rectangle([x1, y1, x2, y2], fill=terrain_color(maze.costs[i][j]))
+
+    return ImageTk.PhotoImage(img)
+
+
+def _palette():
+    # Every colour a maze image can contain, for drawing GIF frames in "P" mode
+    colors = [(0, 0, 0), (40, 40, 40), (255, 0, 0), (0, 171, 28), SOLUTION_FILL, EXPLORED_FILL, (237, 240, 252)]
+    colors += [terrain_color(cost) for cost in range(2, 10)]
+    palette = Image.new("P", (1, 1))
+    palette.putpalette([channel for color in colors for channel in color])
+    return palette, colors.index(SOLUTION_FILL), colors.index(EXPLORED_FILL)
+
+
+def _gif_frame(img, box, delay):
+    """
+    Encodes the box region of a palette image as one GIF frame (graphic
+    control extension + image descriptor + local colour table + LZW data)
+    positioned at the box's corner. PIL does the LZW encoding; only the
+    blocks after its header are kept.
+    """
+    left, top, right, bottom = box
+    buffer = io.BytesIO()
+    img.crop(box).save(buffer, "GIF", optimize=False)
+    data = buffer.getvalue()
+
+    flags = data[10]
+    table = data[13:13 + (3 << ((flags & 7) + 1))] if flags & 0x80 else b""
+    position = 13 + len(table)
+    while data[position] == 0x21: # Skip PIL's extension blocks
+        position += 2
+        while data[position]:
+            position += data[position] + 1
+        position += 1
+
+    # Move the global colour table into a local one, so frames need not share it
+    image_flags = data[position + 9]
+    if table and not image_flags & 0x80:
+        image_flags = (image_flags & 0x40) | 0x80 | (flags & 7)
+    else:
+        table = b""
+    return (
+        b"\x21\xf9\x04\x04" + struct.pack("<H", delay) + b"\x00\x00"
+        + b"\x2c" + struct.pack("<HHHHB", left, top, right - left, bottom - top, image_flags)
+        + table + data[position + 10:-1]
+    )
+
+
+def _render_frames(frames):
+    """
+    Renders frames [first, last) of the trace being replayed and returns
+    them as encoded GIF frames. The maze is drawn once and brought up to
+    the first frame; after that each frame only paints and encodes the
+    cells that changed.
+    """
+    first, last, delay = frames
+    maze, trace = _replay
+    markers = set(maze.starts) | set(maze.goals)
+    expanded = len(trace.expanded)
+    palette, solution_fill, explored_fill = _palette()
+
+    img = Image.new("RGB", (maze.width * CELL_SIZE, maze.height * CELL_SIZE), "black")
+    _draw_cells(maze, ImageDraw.Draw(img), show_solution=False, show_explored=False)
+    img = img.quantize(palette=palette, dither=Image.Dither.NONE)
+    draw = ImageDraw.Draw(img)
+    for i, j in trace.cells(0, min(max(first - 1, 0), expanded)):
+        if (i, j) not in markers:
+            _paint(draw, i, j, explored_fill)
+
+    rendered = []
+    for frame in range(first, last):
+        if frame == 0:
+            changed = [(0, 0), (maze.height - 1, maze.width - 1)] # The whole maze
+        elif frame <= expanded:
+            changed = [divmod(trace.expanded[frame - 1], trace.width)]
+        elif trace.solution is not None:
+            changed = list(trace.solution.iter_cells(include_start=True))
+        else:
+            changed = []
+        changed = [cell for cell in changed if frame == 0 or cell not in markers]
+        for i, j in changed:
+            if frame > 0:
+                _paint(draw, i, j, explored_fill if frame <= expanded else solution_fill)
+
+        if changed:
+            rows = [i for i, _ in changed]
+            cols = [j for _, j in changed]
+            box = (min(cols) * CELL_SIZE, min(rows) * CELL_SIZE, (max(cols) + 1) * CELL_SIZE, (max(rows) + 1) * CELL_SIZE)
+        else:
+            box = (0, 0, 1, 1) # Nothing changed, repeat one pixel to keep the timing
+        rendered.append(_gif_frame(img, box, delay))
+    return rendered
+
+
+def save_trace_gif(maze, trace, gif_path, frame_delay=250, workers=None):
+    """
+    Replays a SearchTrace into an animated GIF. Frame ranges are rendered
+    and encoded in parallel worker processes and the frames are written to
+    the file in order as they come back, so memory stays flat however long
+    the trace is.
+    """
+    global _replay
+    workers = workers or multiprocessing.cpu_count()
+    total = trace.num_frames
+    step = max(1, -(-total // (workers * 4)))
+    delay = max(1, round(frame_delay / 10)) # GIF delays are in hundredths of a second
+    ranges = [(first, min(first + step, total), delay) for first in range(0, total, step)]
+
+    _replay = (maze, trace)
+    pool = None
+    try:
+        if workers == 1 or len(ranges) == 1 or "fork" not in multiprocessing.get_all_start_methods():
+            batches = map(_render_frames, ranges)
+        else:
+            pool = multiprocessing.get_context("fork").Pool(workers)
+            batches = pool.imap(_render_frames, ranges)
+
+        with open(gif_path, "wb") as f:
+            f.write(b"GIF89a" + struct.pack("<HHBBB", maze.width * CELL_SIZE, maze.height * CELL_SIZE, 0, 0, 0))
+            f.write(b"\x21\xff\x0bNETSCAPE2.0\x03\x01\x00\x00\x00") # Loop forever
+            for batch in batches:
+                f.write(b"".join(batch))
+            f.write(b"\x3b")
+    finally:
+        if pool is not None:
+            pool.close()
+            pool.join()
+        _replay = None
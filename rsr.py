@@ -0,0 +1,205 @@
+import heapq
+from array import array
+from path import Path
+from visited import CellSet
+from search_step import SearchStep, run
+
+
+class RectangleDecomposition():
+    """
+    Rectangular Symmetry Reduction preprocessing: the open cells are split
+    greedily into maximal empty rectangles, and only the cells on each
+    rectangle's perimeter are kept as search nodes. A perimeter node links
+    to its neighbors on the perimeter, to the cells across the rectangle
+    boundary, and by a macro edge to the cell straight across on the
+    opposite side. On a 4-connected unweighted grid this keeps at least one
+    optimal path between any two perimeter nodes while skipping the many
+    equal-length paths through the interior.
+
+    Built once per maze (see Maze.rectangle_decomposition) and reused for
+    every search until a wall changes.
+    """
+    def __init__(self, maze):
+        if maze.costs is not None:
+            raise Exception("rectangular symmetry reduction needs an unweighted maze")
+        self.width = maze.width
+        self.height = maze.height
+        self.rect_of = array("i", [-1]) * (self.width * self.height)
+        self.rects = []           # (top, left, bottom, right), inclusive
+
+        width = self.width
+        walls = maze.walls
+        rect_of = self.rect_of
+        for row in range(self.height):
+            for col in range(width):
+                if walls[row][col] or rect_of[row * width + col] >= 0:
+                    continue
+                # Grow right as far as possible, then down while the whole span stays free
+                right = col
+                while right + 1 < width and not walls[row][right + 1] and rect_of[row * width + right + 1] < 0:
+                    right += 1
+                bottom = row
+                while bottom + 1 < self.height and all(
+                    not walls[bottom + 1][c] and rect_of[(bottom + 1) * width + c] < 0
+                    for c in range(col, right + 1)
+                ):
+                    bottom += 1
+
+                rect = len(self.rects)
+                self.rects.append((row, col, bottom, right))
+                for r in range(row, bottom + 1):
+                    for c in range(col, right + 1):
+                        rect_of[r * width + c] = rect
+
+    def rect(self, state):
+        row, col = state
+        return self.rect_of[row * self.width + col]
+
+    def on_perimeter(self, state):
+        top, left, bottom, right = self.rects[self.rect(state)]
+        row, col = state
+        return row == top or row == bottom or col == left or col == right
+
+    @property
+    def num_nodes(self):
+        """Number of perimeter cells kept in the reduced graph."""
+        nodes = 0
+        for top, left, bottom, right in self.rects:
+            height = bottom - top + 1
+            width = right - left + 1
+            nodes += height * width - max(0, height - 2) * max(0, width - 2)
+        return nodes
+
+    def neighbors(self, state):
+        """Yields (cost, state) for the reduced-graph edges out of a perimeter cell."""
+        rect = self.rect(state)
+        top, left, bottom, right = self.rects[rect]
+        row, col = state
+        rect_of = self.rect_of
+        width = self.width
+
+        for r, c in ((row - 1, col), (row + 1, col), (row, col - 1), (row, col + 1)):
+            if 0 <= r < self.height and 0 <= c < width:
+                other = rect_of[r * width + c]
+                if other < 0:
+                    continue
+                if other != rect or r == top or r == bottom or c == left or c == right:
+                    yield 1, (r, c) # Across the boundary, or along the perimeter
+
+        # Macro edges straight across the rectangle
+        if row == top and bottom > top + 1:
+            yield bottom - top, (bottom, col)
+        if row == bottom and bottom > top + 1:
+            yield bottom - top, (top, col)
+        if col == left and right > left + 1:
+            yield right - left, (row, right)
+        if col == right and right > left + 1:
+            yield right - left, (row, left)
+
+    def projections(self, state):
+        """Yields (cost, state) from a cell to the four perimeter cells in line with it."""
+        top, left, bottom, right = self.rects[self.rect(state)]
+        row, col = state
+        for cell in ((top, col), (bottom, col), (row, left), (row, right)):
+            if cell != state:
+                yield abs(cell[0] - row) + abs(cell[1] - col), cell
+
+
+def solve_rsr(maze, method="manhattan", budget=None):
+    """
+    A* over the reduced graph of maze.rectangle_decomposition(). Starts and
+    goals inside a rectangle are linked to it temporarily: a start to its
+    four projections on the perimeter, and every node of a goal's rectangle
+    directly to the goal. The path found is expanded back to single steps.
+    Fills maze.solution, co_path, num_explored (reduced nodes expanded) and
+    explored like Maze.solve, and honors an optional SearchBudget the same
+    way.
+    """
+    return run(iter_rsr(maze, method, budget, SearchStep(maze)))
+
+
+def iter_rsr(maze, method, budget, step):
+    """solve_rsr as a generator of SearchSteps, see Maze.iter_solve."""
+    reduction = maze.rectangle_decomposition()
+    h = maze.heuristic_function(method)
+    goals = set(maze.goals)
+    goals_in = {}
+    for goal in maze.goals:
+        goals_in.setdefault(reduction.rect(goal), []).append(goal)
+
+    best_g = {}
+    parents = {}
+    queue = []
+    counter = 0
+    for start in maze.starts:
+        best_g[start] = 0
+        parents[start] = None
+        heapq.heappush(queue, (h(start), counter, start))
+        counter += 1
+    closed = CellSet(maze.width, maze.height)
+    step.frontiers = (queue,)
+
+    while queue:
+        if budget is not None and maze.num_explored >= budget.next_check:
+            reason = budget.check(maze.num_explored)
+            if reason is not None:
+                result = budget.exhausted(reason, maze.num_explored, len(queue))
+                yield step.stopped(result)
+                return result
+
+        _, _, state = heapq.heappop(queue)
+        if state in closed:
+            continue # Stale entry
+        closed.add(state)
+        maze.num_explored += 1
+        maze.explored.add(state)
+
+        if state in goals:
+            maze.co_path = best_g[state]
+            maze.solution = _expand(parents, state)
+            maze.connected = (maze.solution.start, state)
+            yield step.found(state, maze.solution)
+            return
+
+        if parents[state] is None and not reduction.on_perimeter(state):
+            edges = list(reduction.projections(state))
+        else:
+            edges = list(reduction.neighbors(state))
+        for goal in goals_in.get(reduction.rect(state), ()):
+            if goal != state:
+                edges.append((abs(goal[0] - state[0]) + abs(goal[1] - state[1]), goal))
+
+        g = best_g[state]
+        for cost, succ in edges:
+            score_g = g + cost
+            if succ in closed or score_g >= best_g.get(succ, float("inf")):
+                continue
+            best_g[succ] = score_g
+            parents[succ] = state
+            heapq.heappush(queue, (score_g + h(succ), counter, succ))
+            counter += 1
+
+        step.cell = state
+        yield step
+
+    raise Exception("no solution")
+
+
+def _expand(parents, goal):
+    # Expand each hop into single steps. Every hop stays inside one empty
+    # rectangle (or crosses to a neighbor cell), so rows-then-columns is open
+    hops = []
+    state = goal
+    while parents[state] is not None:
+        hops.append((parents[state], state))
+        state = parents[state]
+
+    path = Path(state)
+    for (row, col), (next_row, next_col) in reversed(hops):
+        vertical = 1 if next_row > row else 0 # Codes: up, down, left, right
+        for _ in range(abs(next_row - row)):
+            path.append_code(vertical)
+        horizontal = 3 if next_col > col else 2
+        for _ in range(abs(next_col - col)):
+            path.append_code(horizontal)
+    return path
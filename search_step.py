@@ -0,0 +1,63 @@
+# Kinds of step Maze.iter_solve yields
+EXPANDED = "expanded"   # cell was expanded, the search goes on
+FOUND = "found"         # cell is the goal reached, solution holds the path
+STOPPED = "stopped"     # a budget stopped the search, result says why
+
+
+class SearchStep():
+    """
+    The event Maze.iter_solve yields. A search creates one SearchStep and
+    only stores the expanded cell in it before every yield; frontier_size
+    and num_explored are read from the search when asked for. Stepping
+    therefore allocates nothing beyond what the search itself does, and
+    the fields describe the search as it is now: copy them out if they are
+    needed after the next step.
+
+    kind          - EXPANDED, FOUND or STOPPED
+    cell          - the (row, col) just expanded, or the goal reached
+    frontier_size - nodes left in the frontier(s)
+    num_explored  - expansions so far
+    solution      - the Path, once found
+    result        - the budget.BudgetExhausted, once stopped
+    """
+    def __init__(self, maze, *frontiers):
+        self.maze = maze
+        self.frontiers = frontiers
+        self.kind = EXPANDED
+        self.cell = None
+        self.solution = None
+        self.result = None
+
+    @property
+    def frontier_size(self):
+        return sum(len(frontier) for frontier in self.frontiers)
+
+    @property
+    def num_explored(self):
+        return self.maze.num_explored
+
+    def found(self, cell, solution):
+        self.kind = FOUND
+        self.cell = cell
+        self.solution = solution
+        return self
+
+    def stopped(self, result):
+        self.kind = STOPPED
+        self.result = result
+        return self
+
+    def __repr__(self):
+        return f"SearchStep({self.kind!r}, cell={self.cell}, frontier_size={self.frontier_size}, num_explored={self.num_explored})"
+
+
+def run(steps):
+    """
+    Pulls every step out of a step generator and returns its return value:
+    None once a solution is found, or the BudgetExhausted that stopped it.
+    """
+    while True:
+        try:
+            next(steps)
+        except StopIteration as stop:
+            return stop.value
@@ -0,0 +1,72 @@
+import struct
+from array import array
+from path import Path
+from visited import CellSet
+
+MAGIC = b"MAZETRC1"
+_HEADER = struct.Struct("<8sQQQ")   # magic, width, height, expanded cells
+_SOLUTION = struct.Struct("<QQQ")   # start row, start col, path length
+
+
+class SearchTrace():
+    """
+    Compact record of one search: the ids (row * width + col) of the cells
+    in the order they were marked explored, plus the final path. Recording
+    is one array append per expansion, so it can stay on in the hot loop;
+    frames are rebuilt from the trace afterwards (render.save_trace_gif)
+    or replayed in the GUI without solving again.
+
+    Frame 0 shows the maze before the search, frame k the first k explored
+    cells, and the last frame adds the solution.
+    """
+    def __init__(self, width, height):
+        self.width = width
+        self.height = height
+        self.expanded = array("q")
+        self.solution = None
+
+    def record(self, cell):
+        row, col = cell
+        self.expanded.append(row * self.width + col)
+
+    @property
+    def num_frames(self):
+        return len(self.expanded) + 2
+
+    def cells(self, first=0, last=None):
+        """Yields the explored cells with trace positions first to last, in order."""
+        width = self.width
+        for index in self.expanded[first:last]:
+            yield divmod(index, width)
+
+    def explored_at(self, frame):
+        """The cells shown as explored in the given frame."""
+        return CellSet(self.width, self.height, self.cells(0, min(frame, len(self.expanded))))
+
+    def save(self, filename):
+        with open(filename, "wb") as f:
+            f.write(_HEADER.pack(MAGIC, self.width, self.height, len(self.expanded)))
+            self.expanded.tofile(f)
+            if self.solution is not None:
+                row, col = self.solution.start
+                f.write(_SOLUTION.pack(row, col, self.solution.length))
+                f.write(self.solution.data)
+
+    @classmethod
+    def load(cls, filename):
+        with open(filename, "rb") as f:
+            magic, width, height, count = _HEADER.unpack(f.read(_HEADER.size))
+            if magic != MAGIC:
+                raise Exception(f"{filename} is not a search trace file")
+            trace = cls(width, height)
+            trace.expanded.fromfile(f, count)
+            header = f.read(_SOLUTION.size)
+            if header:
+                row, col, length = _SOLUTION.unpack(header)
+                trace.solution = Path((row, col))
+                trace.solution.length = length
+                trace.solution.data = bytearray(f.read((length + 3) >> 2))
+        return trace
+
+    def __repr__(self):
+        return f"SearchTrace({self.width}x{self.height}, {len(self.expanded)} expanded)"
@@ -0,0 +1,56 @@
+import json
+import os
+import socket
+
+
+class SolverClient():
+    """
+    Thin client for solver_service.py listening on a Unix socket.
+    Responses are dicts with "status", "co_path", "num_explored",
+    "actions", "cells" and "connected" (or "error" on failure).
+    """
+    def __init__(self, socket_path):
+        self.sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self.sock.connect(socket_path)
+        self.stream = self.sock.makefile("rwb")
+        self.next_id = 0
+
+    def solve(self, maze=None, text=None, algo="a*", method="manhattan"):
+        # Solve a single maze given by file path or by its contents
+        return self.solve_many([{"maze": maze, "text": text, "algo": algo, "method": method}])[0]
+
+    def solve_many(self, requests):
+        """
+        Sends all requests at once so the service can batch them, then
+        returns the responses in request order.
+        """
+        ids = []
+        for request in requests:
+            request = {key: value for key, value in request.items() if value is not None}
+            if "maze" in request:
+                # The service may run in another directory
+                request["maze"] = os.path.abspath(request["maze"])
+            request["id"] = self.next_id
+            ids.append(self.next_id)
+            self.next_id += 1
+            self.stream.write((json.dumps(request) + "\n").encode())
+        self.stream.flush()
+
+        responses = {}
+        while len(responses) < len(ids):
+            line = self.stream.readline()
+            if not line:
+                raise Exception("solver service closed the connection")
+            response = json.loads(line)
+            responses[response["id"]] = response
+        return [responses[request_id] for request_id in ids]
+
+    def close(self):
+        self.stream.close()
+        self.sock.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
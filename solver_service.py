@@ -0,0 +1,245 @@
+"""
+Long-running local maze solver service.
+
+Requests and responses are JSON objects, one per line, exchanged over a Unix
+socket (--socket PATH) or stdin/stdout (--stdio). A request names a maze by
+file path ("maze") or carries its contents ("text"), plus "algo",
+"method", an optional "tie_break", and an "id" that is echoed back in the
+response:
+
+    {"id": 1, "maze": "maze_examples/maze21.txt", "algo": "a*", "method": "manhattan"}
+
+Parsed mazes stay cached in the worker processes, keyed by a fingerprint of
+their contents. Requests that arrive close together are batched per maze
+and each batch's results are streamed back as soon as it finishes.
+"""
+import argparse
+import asyncio
+import hashlib
+import json
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+CACHE_SIZE = 64 # Parsed mazes kept per worker process
+
+_mazes = {} # Worker-side cache: fingerprint -> Maze, least recently used first
+
+
+def _load(fingerprint, path, text):
+    # Returns the cached Maze for a fingerprint, parsing it on a miss
+    maze = _mazes.pop(fingerprint, None)
+    if maze is None:
+        from maze import Maze
+        maze = Maze(filename=path) if text is None else Maze(text=text)
+        if len(_mazes) >= CACHE_SIZE:
+            _mazes.pop(next(iter(_mazes)))
+    _mazes[fingerprint] = maze
+    return maze
+
+
+def _hash_file(path):
+    with open(path, "rb") as f:
+        return hashlib.sha1(f.read()).hexdigest()
+
+
+async def _respond(send, future, response):
+    # Sends one response and resolves its request's future whatever happens,
+    # so the connection waiting on it never hangs on a failed send
+    try:
+        await send(response)
+    except Exception as e:
+        future.set_exception(e)
+    else:
+        future.set_result(None)
+
+
+def _solve_batch(fingerprint, path, text, requests):
+    """Solves a batch of requests that all target the same maze, in a worker process."""
+    try:
+        maze = _load(fingerprint, path, text)
+    except Exception as e:
+        return [{"id": request.get("id"), "status": "error", "error": str(e)} for request in requests]
+
+    results = []
+    for request in requests:
+        start_time = time.perf_counter()
+        try:
+            maze.solve(
+                request.get("algo", "a*"),
+                method=request.get("method") or "manhattan",
+                tie_break=request.get("tie_break") or "fifo",
+            )
+            actions, cells = maze.solution
+            results.append({
+                "id": request.get("id"),
+                "status": "ok",
+                "fingerprint": fingerprint,
+                "time": time.perf_counter() - start_time,
+                "num_explored": maze.num_explored,
+                "co_path": maze.co_path,
+                "connected": maze.connected,
+                "actions": list(actions),
+                "cells": list(cells),
+            })
+        except Exception as e:
+            results.append({"id": request.get("id"), "status": "error", "error": str(e)})
+    return results
+
+
+class SolverService():
+    """
+    Collects incoming requests, batches them per maze fingerprint and runs
+    the batches on a pool of worker processes.
+    """
+    def __init__(self, workers=None, batch_size=32, batch_window=0.002):
+        self.executor = ProcessPoolExecutor(workers)
+        self.batch_size = batch_size
+        self.batch_window = batch_window
+        self.queue = None
+        self.fingerprints = {} # path -> (mtime_ns, size, fingerprint)
+
+    async def fingerprint(self, request):
+        """
+        Returns (fingerprint, path, text) for the maze a request refers to.
+        Files are hashed in a thread so a large maze does not stall the
+        event loop.
+        """
+        text = request.get("text")
+        if text is not None:
+            return hashlib.sha1(text.encode()).hexdigest(), None, text
+
+        path = os.path.abspath(request["maze"])
+        stat = os.stat(path)
+        cached = self.fingerprints.get(path)
+        if cached is None or cached[:2] != (stat.st_mtime_ns, stat.st_size):
+            digest = await asyncio.get_running_loop().run_in_executor(None, _hash_file, path)
+            cached = self.fingerprints[path] = (stat.st_mtime_ns, stat.st_size, digest)
+        return cached[2], path, None
+
+    async def submit(self, request, send):
+        """Queues a request; send is a coroutine function called with its response."""
+        future = asyncio.get_running_loop().create_future()
+        await self.queue.put((request, send, future))
+        await future
+
+    async def run_batches(self):
+        # Drain the queue into batches of up to batch_size, waiting at most batch_window
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = [await self.queue.get()]
+            deadline = loop.time() + self.batch_window
+            while len(batch) < self.batch_size:
+                remaining = deadline - loop.time()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(self.queue.get(), remaining))
+                except asyncio.TimeoutError:
+                    break
+
+            groups = {}
+            for request, send, future in batch:
+                try:
+                    key = await self.fingerprint(request)
+                except Exception as e:
+                    await _respond(send, future, {"id": request.get("id"), "status": "error", "error": str(e)})
+                    continue
+                groups.setdefault(key, []).append((request, send, future))
+
+            for key, items in groups.items():
+                asyncio.create_task(self.run_group(key, items))
+
+    async def run_group(self, key, items):
+        fingerprint, path, text = key
+        loop = asyncio.get_running_loop()
+        try:
+            results = await loop.run_in_executor(
+                self.executor, _solve_batch, fingerprint, path, text, [request for request, _, _ in items]
+            )
+        except Exception as e:
+            results = [{"id": request.get("id"), "status": "error", "error": str(e)} for request, _, _ in items]
+
+        for (request, send, future), result in zip(items, results):
+            await _respond(send, future, result)
+
+    async def handle_lines(self, reader, send):
+        # Reads JSON-lines requests until EOF and waits for all of their responses
+        pending = []
+        while True:
+            line = await reader.readline()
+            if not line:
+                break
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                request = json.loads(line)
+            except ValueError as e:
+                await send({"id": None, "status": "error", "error": f"invalid JSON: {e}"})
+                continue
+            pending.append(asyncio.create_task(self.submit(request, send)))
+        if pending:
+            await asyncio.gather(*pending)
+
+    async def serve_stdio(self):
+        loop = asyncio.get_running_loop()
+        reader = asyncio.StreamReader()
+        await loop.connect_read_pipe(lambda: asyncio.StreamReaderProtocol(reader), sys.stdin)
+
+        async def send(response):
+            sys.stdout.write(json.dumps(response) + "\n")
+            sys.stdout.flush()
+
+        await self.handle_lines(reader, send)
+
+    async def serve_socket(self, socket_path):
+        async def handle_connection(reader, writer):
+            async def send(response):
+                writer.write((json.dumps(response) + "\n").encode())
+                await writer.drain()
+            try:
+                await self.handle_lines(reader, send)
+            finally:
+                writer.close()
+
+        if os.path.exists(socket_path):
+            os.unlink(socket_path)
+        server = await asyncio.start_unix_server(handle_connection, path=socket_path)
+        print(f"Maze solver service listening on {socket_path}", file=sys.stderr)
+        async with server:
+            await server.serve_forever()
+
+    async def serve(self, socket_path=None):
+        self.queue = asyncio.Queue()
+        batcher = asyncio.create_task(self.run_batches())
+        try:
+            if socket_path is None:
+                await self.serve_stdio()
+            else:
+                await self.serve_socket(socket_path)
+        finally:
+            batcher.cancel()
+            self.executor.shutdown()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Local maze solver service (JSON lines).")
+    mode = parser.add_mutually_exclusive_group(required=True)
+    mode.add_argument("--socket", help="path of the Unix socket to listen on")
+    mode.add_argument("--stdio", action="store_true", help="read requests from stdin and write responses to stdout")
+    parser.add_argument("--workers", type=int, default=None, help="number of worker processes")
+    parser.add_argument("--batch-size", type=int, default=32)
+    parser.add_argument("--batch-window", type=float, default=0.002, help="seconds to wait for a batch to fill")
+    args = parser.parse_args()
+
+    service = SolverService(args.workers, args.batch_size, args.batch_window)
+    try:
+        asyncio.run(service.serve(args.socket))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,109 @@
+import shutil
+import sys
+
+# Characters used for each kind of cell
+WALL = "█"
+START = "A"
+GOAL = "B"
+PATH = "*"
+EXPLORED = "."
+EMPTY = " "
+
+
+def _cell_char(maze, i, j, starts, goals, path, explored):
+    # Character for a single cell, using the same precedence as the original print
+    if maze.walls[i][j]:
+        return WALL
+    if (i, j) in starts:
+        return START
+    if (i, j) in goals:
+        return GOAL
+    if path is not None and (i, j) in path:
+        return PATH
+    if path is not None and (i, j) in explored:
+        return EXPLORED
+    if maze.costs is not None and maze.costs[i][j] > 1:
+        return str(maze.costs[i][j])
+    return EMPTY
+
+
+def _block_char(maze, top, left, size, starts, goals, path, explored):
+    """
+    Character for a size x size block of cells when downsampling.
+    Markers win over plain cells (start, goal, path, explored), otherwise
+    the block shows a wall if walls make up at least half of it.
+    """
+    bottom = min(top + size, maze.height)
+    right = min(left + size, maze.width)
+    walls = 0
+    found = EMPTY
+    rank = {START: 4, GOAL: 3, PATH: 2, EXPLORED: 1}
+    for i in range(top, bottom):
+        row = maze.walls[i]
+        for j in range(left, right):
+            if row[j]:
+                walls += 1
+                continue
+            char = _cell_char(maze, i, j, starts, goals, path, explored)
+            if rank.get(char, 0) > rank.get(found, 0):
+                found = char
+    if found != EMPTY:
+        return found
+    if walls * 2 >= (bottom - top) * (right - left):
+        return WALL
+    return EMPTY
+
+
+def render_rows(maze, viewport=None, scale=1):
+    """
+    Returns the maze as a list of strings, one per printed row.
+    viewport is (top, left, height, width) in cells and crops the maze;
+    scale > 1 folds every scale x scale block into one character.
+    """
+    if viewport is None:
+        top, left, height, width = 0, 0, maze.height, maze.width
+    else:
+        top, left, height, width = viewport
+    top = max(0, top)
+    left = max(0, left)
+    bottom = min(maze.height, top + height)
+    right = min(maze.width, left + width)
+
+    path = set(maze.solution[1]) if maze.solution is not None else None
+    starts = set(maze.starts)
+    goals = set(maze.goals)
+    explored = maze.explored
+
+    rows = []
+    if scale <= 1:
+        for i in range(top, bottom):
+            rows.append("".join(
+                _cell_char(maze, i, j, starts, goals, path, explored) for j in range(left, right)
+            ))
+    else:
+        for i in range(top, bottom, scale):
+            rows.append("".join(
+                _block_char(maze, i, j, scale, starts, goals, path, explored)
+                for j in range(left, right, scale)
+            ))
+    return rows
+
+
+def fit_scale(maze, viewport=None):
+    """Smallest scale at which the maze (or viewport) fits in the terminal."""
+    columns, lines = shutil.get_terminal_size()
+    height = maze.height if viewport is None else viewport[2]
+    width = maze.width if viewport is None else viewport[3]
+    lines = max(1, lines - 3) # Leave room for the blank lines around the maze
+    return max(1, -(-width // columns), -(-height // lines))
+
+
+def print_maze(maze, viewport=None, fit=False, stream=None):
+    """
+    Prints the maze with a single write. With fit=True the maze is
+    downsampled just enough to fit the terminal.
+    """
+    scale = fit_scale(maze, viewport) if fit else 1
+    rows = render_rows(maze, viewport, scale)
+    stream = sys.stdout if stream is None else stream
+    stream.write("\n" + "\n".join(rows) + "\n\n")
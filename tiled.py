@@ -0,0 +1,566 @@
+"""
+Out-of-core solving for mazes larger than memory.
+
+A maze is converted once into a tiled binary file: a small header followed
+by square tiles of tile_size x tile_size cells, one byte per cell (0 for a
+wall, otherwise the cost of entering the cell). Each tile is padded to a
+whole number of pages so it can be dropped from memory on its own.
+
+TiledMaze memory-maps that file and keeps only an LRU of recently used
+tiles resident. The search state (one byte per cell: how the cell was
+reached) lives in a scratch file with the same layout, and the frontier
+spills to disk once it holds more than its share of the memory limit.
+BFS and A* (manhattan or chebyshev) are supported.
+
+    python tiled.py convert maze.txt maze.tiled --tile-size 64
+    python tiled.py solve maze.tiled --algo a* --memory-limit 64M
+"""
+import argparse
+import mmap
+import os
+import struct
+import tempfile
+import time
+from array import array
+from collections import OrderedDict, deque
+from path import Path
+
+MAGIC = b"MAZETIL1"
+_HEADER = struct.Struct("<8sQQIIII")  # magic, width, height, tile_size, tile_bytes, starts, goals
+_POINT = struct.Struct("<QQ")
+
+# Cell bytes for the characters of a maze text file, anything else is a wall
+_CELL_BYTES = bytearray(256)
+for _char in b" AB":
+    _CELL_BYTES[_char] = 1
+for _digit in range(1, 10):
+    _CELL_BYTES[ord(str(_digit))] = _digit
+_CELL_BYTES = bytes(_CELL_BYTES)
+
+_ROW_STEP = (-1, 1, 0, 0)  # Same order as path.ACTIONS
+_COL_STEP = (0, 0, -1, 1)
+_SEED = 5                  # State byte of a start cell, 1-4 are move codes + 1
+
+
+def _round_up(size, unit):
+    return -(-size // unit) * unit
+
+
+def parse_size(text):
+    """Parses a byte count such as "512M" or "2G"."""
+    units = {"K": 1 << 10, "M": 1 << 20, "G": 1 << 30}
+    text = text.strip().upper()
+    if text and text[-1] in units:
+        return int(float(text[:-1]) * units[text[-1]])
+    return int(text)
+
+
+class TiledWriter():
+    """
+    Writes a tiled maze file. The file is created at its full size up front
+    (all walls) and tiles are written in any order, so callers can stream
+    bands of rows or whole tiles without holding the maze in memory.
+    """
+    def __init__(self, filename, width, height, starts, goals, tile_size=64):
+        self.width = width
+        self.height = height
+        self.tile_size = tile_size
+        self.tiles_across = -(-width // tile_size)
+        self.tiles_down = -(-height // tile_size)
+        self.tile_bytes = _round_up(tile_size * tile_size, mmap.PAGESIZE)
+
+        header = _HEADER.pack(MAGIC, width, height, tile_size, self.tile_bytes, len(starts), len(goals))
+        header += b"".join(_POINT.pack(*point) for point in list(starts) + list(goals))
+        self.header_size = _round_up(len(header), mmap.PAGESIZE)
+
+        self.file = open(filename, "wb")
+        self.file.truncate(self.header_size + self.tiles_across * self.tiles_down * self.tile_bytes)
+        self.file.write(header)
+
+    def write_tile(self, tile_row, tile_col, data):
+        """Writes one tile given as tile_size * tile_size cell bytes, row by row."""
+        tile = tile_row * self.tiles_across + tile_col
+        self.file.seek(self.header_size + tile * self.tile_bytes)
+        self.file.write(data)
+
+    def write_band(self, tile_row, rows):
+        """
+        Writes the tile row tile_row from up to tile_size rows of cell bytes,
+        each at most width long. Missing cells are walls.
+        """
+        size = self.tile_size
+        for tile_col in range(self.tiles_across):
+            left = tile_col * size
+            data = bytearray(size * size)
+            for r, row in enumerate(rows):
+                part = row[left:left + size]
+                data[r * size:r * size + len(part)] = part
+            self.write_tile(tile_row, tile_col, data)
+
+    def close(self):
+        self.file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def convert(text_path, tiled_path, tile_size=64):
+    """
+    Converts a maze text file into the tiled format in two streaming passes,
+    never holding more than one band of tile_size rows in memory.
+    """
+    # First pass: dimensions and the start and goal points
+    width = height = 0
+    starts, goals = [], []
+    with open(text_path, encoding="utf-8") as f:
+        for row, line in enumerate(f):
+            line = line.rstrip("\r\n")
+            width = max(width, len(line))
+            height = row + 1
+            for char, points in (("A", starts), ("B", goals)):
+                col = line.find(char)
+                while col >= 0:
+                    points.append((row, col))
+                    col = line.find(char, col + 1)
+    if not starts or not goals:
+        raise Exception("maze must have at least one start and one goal point")
+
+    # Second pass: translate each band of rows to cell bytes and write its tiles
+    with TiledWriter(tiled_path, width, height, starts, goals, tile_size) as writer, \
+            open(text_path, encoding="utf-8") as f:
+        band = []
+        tile_row = 0
+        for line in f:
+            # Short lines are padded with open cells, like Maze does
+            cells = line.rstrip("\r\n").encode("latin-1", "replace").translate(_CELL_BYTES)
+            band.append(cells + b"\x01" * (width - len(cells)))
+            if len(band) == tile_size:
+                writer.write_band(tile_row, band)
+                tile_row += 1
+                band = []
+        if band:
+            writer.write_band(tile_row, band)
+
+
+class TileCache():
+    """
+    Maps the tiled maze file and a scratch state file with the same layout,
+    and keeps at most capacity tiles of them resident. Tiles that fall out
+    of the LRU are released with madvise(MADV_DONTNEED), so the pages they
+    used no longer count towards the process's resident set.
+    """
+    def __init__(self, filename, capacity):
+        self.file = open(filename, "rb")
+        self.grid = mmap.mmap(self.file.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, self.width, self.height, self.tile_size, self.tile_bytes, num_starts, num_goals = \
+            _HEADER.unpack_from(self.grid, 0)
+        if magic != MAGIC:
+            raise Exception(f"{filename} is not a tiled maze file")
+        points = [
+            _POINT.unpack_from(self.grid, _HEADER.size + i * _POINT.size)
+            for i in range(num_starts + num_goals)
+        ]
+        self.starts = points[:num_starts]
+        self.goals = points[num_starts:]
+        self.tiles_across = -(-self.width // self.tile_size)
+        self.header_size = len(self.grid) - self.tile_bytes * self.tiles_across * -(-self.height // self.tile_size)
+
+        # One state byte per cell, at the same offsets as the grid
+        self.scratch = tempfile.TemporaryFile()
+        self.scratch.truncate(len(self.grid))
+        self.state = mmap.mmap(self.scratch.fileno(), 0)
+
+        self.capacity = max(1, capacity)
+        self.resident = OrderedDict() # tile -> None, least recently used first
+        self.last_tile = -1
+        self.misses = 0
+
+    def offset(self, row, col):
+        """File offset of a cell, marking its tile as most recently used."""
+        size = self.tile_size
+        tile_row, r = divmod(row, size)
+        tile_col, c = divmod(col, size)
+        tile = tile_row * self.tiles_across + tile_col
+        if tile != self.last_tile:
+            self._touch(tile)
+        return self.header_size + tile * self.tile_bytes + r * size + c
+
+    def _touch(self, tile):
+        self.last_tile = tile
+        if tile in self.resident:
+            self.resident.move_to_end(tile)
+            return
+        self.misses += 1
+        self.resident[tile] = None
+        if len(self.resident) > self.capacity:
+            evicted, _ = self.resident.popitem(last=False)
+            start = self.header_size + evicted * self.tile_bytes
+            if hasattr(self.grid, "madvise") and start % mmap.PAGESIZE == 0:
+                self.grid.madvise(mmap.MADV_DONTNEED, start, self.tile_bytes)
+                self.state.flush(start, self.tile_bytes) # Write dirty pages back before dropping them
+                self.state.madvise(mmap.MADV_DONTNEED, start, self.tile_bytes)
+
+    def close(self):
+        self.state.close()
+        self.scratch.close()
+        self.grid.close()
+        self.file.close()
+
+
+class SpillFile():
+    """
+    Append-only temporary file holding runs of integers spilled by one or
+    more SpillQueues. It is emptied once every spilled entry has been read
+    back.
+    """
+    def __init__(self):
+        self.file = None
+        self.size = 0         # Bytes written since the file was last emptied
+        self.live = 0         # Entries written and not read back yet
+
+    def write(self, values):
+        """Appends the values and returns their offset in the file."""
+        if self.file is None:
+            self.file = tempfile.TemporaryFile()
+        offset = self.size
+        os.pwrite(self.file.fileno(), values.tobytes(), offset)
+        self.size += values.itemsize * len(values)
+        self.live += len(values)
+        return offset
+
+    def read(self, offset, count):
+        values = array("q")
+        values.frombytes(os.pread(self.file.fileno(), count * values.itemsize, offset))
+        self.live -= count
+        if not self.live:
+            self.file.truncate(0)
+            self.size = 0
+        return values
+
+    def close(self):
+        if self.file is not None:
+            self.file.close()
+
+
+class SpillQueue():
+    """
+    FIFO queue of integers that keeps at most 2 * limit of them in memory.
+    When the in-memory tail fills up (or flush() is called) it is appended
+    to the spill file as one chunk; chunks are read back in order, at most
+    limit entries at a time, once the head runs dry. Several queues can
+    share one SpillFile.
+    """
+    def __init__(self, limit, spill=None):
+        self.limit = max(1, limit)
+        self.head = array("q")
+        self.position = 0
+        self.tail = array("q")
+        self.chunks = deque() # [offset, count] of the spilled chunks, oldest first
+        self.owns_spill = spill is None
+        self.spill = SpillFile() if spill is None else spill
+        self.length = 0
+        self.spilled = 0
+
+    @property
+    def resident(self):
+        """Entries held in memory."""
+        return len(self.head) - self.position + len(self.tail)
+
+    def flush(self):
+        """Writes the in-memory tail to the spill file."""
+        if self.tail:
+            self.chunks.append([self.spill.write(self.tail), len(self.tail)])
+            self.spilled += len(self.tail)
+            self.tail = array("q")
+
+    def push(self, value):
+        self.tail.append(value)
+        self.length += 1
+        if len(self.tail) >= self.limit:
+            self.flush()
+
+    def pop(self):
+        if self.position == len(self.head):
+            if self.chunks:
+                # Oldest spilled chunk comes before anything still in the tail
+                chunk = self.chunks[0]
+                count = min(chunk[1], self.limit)
+                self.head = self.spill.read(chunk[0], count)
+                chunk[0] += count * self.head.itemsize
+                chunk[1] -= count
+                if not chunk[1]:
+                    self.chunks.popleft()
+            else:
+                self.head, self.tail = self.tail, array("q")
+            self.position = 0
+        value = self.head[self.position]
+        self.position += 1
+        self.length -= 1
+        return value
+
+    def close(self):
+        if self.owns_spill:
+            self.spill.close()
+
+    def __len__(self):
+        return self.length
+
+
+class SpillBuckets():
+    """
+    FIFO buckets of integers keyed by an integer priority (A*'s f-value)
+    that share one in-memory limit. When the buckets together hold more
+    than limit entries, the tails of the buckets with the largest keys,
+    which are popped last, are written to a shared spill file until half
+    the limit is left. Only the bucket being popped reads entries back, at
+    most limit / 2 at a time, so memory stays within about 1.5 * limit
+    entries however many distinct keys there are.
+    """
+    def __init__(self, limit):
+        self.limit = max(2, limit)
+        self.spill = SpillFile()
+        self.buckets = {}
+        self.resident = 0
+        self.length = 0
+        self.spilled = 0
+
+    def push(self, key, value):
+        bucket = self.buckets.get(key)
+        if bucket is None:
+            bucket = self.buckets[key] = SpillQueue(self.limit // 2, self.spill)
+        resident = bucket.resident
+        bucket.push(value)
+        self.resident += bucket.resident - resident
+        self.length += 1
+        if self.resident > self.limit:
+            self._evict()
+
+    def pop(self):
+        """Removes the oldest entry of the lowest key, returns (key, value)."""
+        key = min(self.buckets)
+        bucket = self.buckets[key]
+        resident = bucket.resident
+        value = bucket.pop()
+        self.resident += bucket.resident - resident
+        self.length -= 1
+        if not len(bucket):
+            self.spilled += bucket.spilled
+            del self.buckets[key]
+        return key, value
+
+    def _evict(self):
+        for key in sorted(self.buckets, reverse=True):
+            if self.resident <= self.limit // 2:
+                break
+            bucket = self.buckets[key]
+            resident = bucket.resident
+            bucket.flush()
+            self.resident += bucket.resident - resident
+
+    def close(self):
+        for bucket in self.buckets.values():
+            self.spilled += bucket.spilled
+        self.buckets.clear()
+        self.spill.close()
+
+    def __len__(self):
+        return self.length
+
+
+class TiledMaze():
+    """
+    Solves a tiled maze file without loading it. memory_limit (bytes) is
+    split between the tile cache (half) and the frontier (a quarter); the
+    rest is headroom for the interpreter. cache_tiles and frontier_limit
+    (frontier entries kept in memory, across all of A*'s f-buckets)
+    override the derived sizes.
+
+    After solve(), solution, co_path and num_explored are set like on Maze.
+    """
+    def __init__(self, filename, memory_limit=256 << 20, cache_tiles=None, frontier_limit=None):
+        self.filename = filename
+        with open(filename, "rb") as f:
+            header = f.read(_HEADER.size)
+        _, width, height, tile_size, tile_bytes, _, _ = _HEADER.unpack(header)
+        self.width = width
+        self.height = height
+        self.tile_size = tile_size
+        self.cache_tiles = cache_tiles or max(1, memory_limit // 2 // (2 * tile_bytes))
+        self.frontier_limit = frontier_limit or max(1024, memory_limit // 4 // 16)
+
+        self.solution = None
+        self.co_path = 0
+        self.num_explored = 0
+        self.connected = None
+        self.tile_misses = 0
+        self.spilled = 0
+
+    def solve(self, algo="bfs", method="manhattan"):
+        if algo not in ("bfs", "a*"):
+            raise Exception(f"{algo} is not supported out of core, use bfs or a*")
+        if algo == "a*" and method not in ("manhattan", "chebyshev"):
+            raise Exception("out-of-core a* needs an integer heuristic: manhattan or chebyshev")
+
+        self.solution = None
+        self.co_path = 0
+        self.num_explored = 0
+        self.connected = None
+        cache = TileCache(self.filename, self.cache_tiles)
+        try:
+            if algo == "bfs":
+                goal = self._bfs(cache)
+            else:
+                goal = self._astar(cache, method)
+            if goal is None:
+                raise Exception("no solution")
+            self._reconstruct(cache, goal)
+        finally:
+            self.tile_misses = cache.misses
+            cache.close()
+
+    def _bfs(self, cache):
+        width, height = self.width, self.height
+        grid, state, offset = cache.grid, cache.state, cache.offset
+        goals = {row * width + col for row, col in cache.goals}
+        frontier = SpillQueue(self.frontier_limit)
+        try:
+            for row, col in cache.starts:
+                state[offset(row, col)] = _SEED
+                frontier.push(row * width + col)
+
+            while len(frontier):
+                cell = frontier.pop()
+                self.num_explored += 1
+                if cell in goals:
+                    return cell
+                row, col = divmod(cell, width)
+                for code in range(4):
+                    r = row + _ROW_STEP[code]
+                    c = col + _COL_STEP[code]
+                    if 0 <= r < height and 0 <= c < width:
+                        position = offset(r, c)
+                        if grid[position] and not state[position]:
+                            state[position] = code + 1 # Reached by this move
+                            frontier.push(r * width + c)
+            return None
+        finally:
+            self.spilled = frontier.spilled
+            frontier.close()
+
+    def _astar(self, cache, method):
+        """
+        A* over f-value buckets. Both heuristics are integer and consistent,
+        so f only takes integer values and a cell is final the first time it
+        is popped; its state byte is written then, not when it is pushed.
+        """
+        width, height = self.width, self.height
+        grid, state, offset = cache.grid, cache.state, cache.offset
+        goal_points = cache.goals
+        goals = {row * width + col for row, col in goal_points}
+
+        def heuristic(row, col):
+            if method == "manhattan":
+                return min(abs(row - r) + abs(col - c) for r, c in goal_points)
+            return min(max(abs(row - r), abs(col - c)) for r, c in goal_points)
+
+        # Entries are cell * 8 + move code, code 4 marking a start cell
+        frontier = SpillBuckets(self.frontier_limit)
+        try:
+            for row, col in cache.starts:
+                frontier.push(heuristic(row, col), (row * width + col) * 8 + 4)
+
+            while len(frontier):
+                f, entry = frontier.pop()
+                cell, code = divmod(entry, 8)
+                row, col = divmod(cell, width)
+                position = offset(row, col)
+                if state[position]:
+                    continue # Already popped with a cheaper path
+                state[position] = _SEED if code == 4 else code + 1
+                self.num_explored += 1
+                if cell in goals:
+                    self.co_path = f # h is 0 at a goal
+                    return cell
+
+                g = f - heuristic(row, col)
+                for code in range(4):
+                    r = row + _ROW_STEP[code]
+                    c = col + _COL_STEP[code]
+                    if 0 <= r < height and 0 <= c < width:
+                        position = offset(r, c)
+                        cost = grid[position]
+                        if cost and not state[position]:
+                            frontier.push(g + cost + heuristic(r, c), (r * width + c) * 8 + code)
+            return None
+        finally:
+            frontier.close()
+            self.spilled = frontier.spilled
+
+    def _reconstruct(self, cache, goal):
+        # Follow the move codes back from the goal twice: once to count the
+        # steps, once to pack them into the Path
+        state, offset, width = cache.state, cache.offset, self.width
+
+        def codes():
+            row, col = divmod(goal, width)
+            while True:
+                value = state[offset(row, col)]
+                if value == _SEED:
+                    return
+                code = value - 1
+                yield code
+                row -= _ROW_STEP[code]
+                col -= _COL_STEP[code]
+
+        length = sum(1 for _ in codes())
+        end = divmod(goal, width)
+        self.solution = Path.from_reversed(end, length, codes())
+        self.connected = (self.solution.start, end)
+
+        # BFS ignores terrain costs while searching, price the path afterwards
+        if not self.co_path:
+            self.co_path = sum(
+                cache.grid[offset(row, col)] for row, col in self.solution.iter_cells()
+            )
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Out-of-core solving of tiled maze files.")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    convert_parser = commands.add_parser("convert", help="convert a maze text file to the tiled format")
+    convert_parser.add_argument("text_path")
+    convert_parser.add_argument("tiled_path")
+    convert_parser.add_argument("--tile-size", type=int, default=64)
+
+    solve_parser = commands.add_parser("solve", help="solve a tiled maze file")
+    solve_parser.add_argument("tiled_path")
+    solve_parser.add_argument("--algo", choices=["bfs", "a*"], default="bfs")
+    solve_parser.add_argument("--method", choices=["manhattan", "chebyshev"], default="manhattan")
+    solve_parser.add_argument("--memory-limit", type=parse_size, default=256 << 20, help="e.g. 64M or 2G")
+    solve_parser.add_argument("--cache-tiles", type=int, default=None)
+    solve_parser.add_argument("--frontier-limit", type=int, default=None)
+    solve_parser.add_argument("--output", help="write the solution cells to this file")
+    args = parser.parse_args()
+
+    if args.command == "convert":
+        convert(args.text_path, args.tiled_path, args.tile_size)
+        return
+
+    maze = TiledMaze(args.tiled_path, args.memory_limit, args.cache_tiles, args.frontier_limit)
+    start_time = time.perf_counter()
+    maze.solve(args.algo, args.method)
+    print(f"Time taken: {time.perf_counter() - start_time:.8f} seconds")
+    print("States Explored:", maze.num_explored)
+    print("Cost of Path:", maze.co_path)
+    print("Tile misses:", maze.tile_misses, "Frontier entries spilled:", maze.spilled)
+    if args.output:
+        with open(args.output, "w") as f:
+            maze.solution.write(f)
+
+
+if __name__ == "__main__":
+    main()
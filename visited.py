@@ -0,0 +1,79 @@
+from collections.abc import Set
+
+
+class CellSet(Set):
+    """
+    Set of (row, col) maze cells stored as a bitset: one bit per cell of a
+    width x height grid, instead of a Python tuple in a hash set.
+
+    It behaves like a read-only set for `in`, iteration, len() and
+    comparisons, so code that only reads maze.explored keeps working.
+    add_id()/has_id() take the flat cell id row * width + col directly.
+    """
+    def __init__(self, width, height, cells=()):
+        self.width = width
+        self.height = height
+        self.bits = bytearray((width * height + 7) >> 3)
+        self.count = 0
+        for cell in cells:
+            self.add(cell)
+
+    @classmethod
+    def _from_iterable(cls, iterable):
+        # Results of set operators (&, |, -) are plain sets
+        return set(iterable)
+
+    def add_id(self, index):
+        mask = 1 << (index & 7)
+        byte = index >> 3
+        if not self.bits[byte] & mask:
+            self.bits[byte] |= mask
+            self.count += 1
+
+    def has_id(self, index):
+        return self.bits[index >> 3] >> (index & 7) & 1 == 1
+
+    def add(self, cell):
+        row, col = cell
+        self.add_id(row * self.width + col)
+
+    def discard(self, cell):
+        row, col = cell
+        index = row * self.width + col
+        mask = 1 << (index & 7)
+        if self.bits[index >> 3] & mask:
+            self.bits[index >> 3] &= ~mask
+            self.count -= 1
+
+    def update(self, cells):
+        for cell in cells:
+            self.add(cell)
+
+    def clear(self):
+        self.bits = bytearray(len(self.bits))
+        self.count = 0
+
+    def __contains__(self, cell):
+        try:
+            row, col = cell
+        except (TypeError, ValueError):
+            return False
+        if not (0 <= row < self.height and 0 <= col < self.width):
+            return False
+        return self.has_id(row * self.width + col)
+
+    def __len__(self):
+        return self.count
+
+    def __iter__(self):
+        # Walk the non-zero bytes only, yielding cells in row-major order
+        width = self.width
+        for byte_index, byte in enumerate(self.bits):
+            if byte:
+                base = byte_index << 3
+                for bit in range(8):
+                    if byte >> bit & 1:
+                        yield divmod(base + bit, width)
+
+    def __repr__(self):
+        return f"CellSet({self.width}x{self.height}, {self.count} cells)"